@@ -13,6 +13,15 @@ HEADERS = {
 # Delay in seconds between requests to avoid overloading the server
 REQUEST_DELAY = 1
 
+# Maximum extra random delay in seconds added to REQUEST_DELAY, so parallel workers do not fire in lockstep
+REQUEST_DELAY_JITTER = 0.2
+
+# Maximum number of requests in flight at once across all scraping threads
+MAX_CONCURRENT_REQUESTS = 8
+
+# Timeout in seconds for HTTP requests made with requests
+REQUEST_TIMEOUT = 10
+
 # URL template for the shutuba_past page
 SHUTUBA_PAST_URL = "https://race.netkeiba.com/race/shutuba_past.html?race_id={}&rf=shutuba_submenu"
 
@@ -22,5 +31,24 @@ PADDOCK_URL = "https://race.netkeiba.com/race/paddock.html?race_id={}"
 # URL template for race announcements/news
 RACE_NEWS_URL = "https://race.netkeiba.com/race/news.html?race_id={}"
 
+# Directory for cached race announcement pages
+ANNOUNCEMENT_CACHE_DIR = "cache/announcements"
+
+# Seconds a cached announcement page stays valid (pages of past-year races never expire)
+ANNOUNCEMENT_CACHE_TTL = 3 * 60 * 60
+
+# Directory for cached horse profile, results, pedigree and training pages
+HORSE_PAGE_CACHE_DIR = "cache/horse_pages"
+
+# Seconds a cached horse profile, results or pedigree page stays valid
+HORSE_PAGE_CACHE_TTL = 24 * 60 * 60
+
+# Seconds a cached pedigree page stays valid (None: never expires). The pedigree itself never
+# changes, but the same page lists siblings, which grow as new foals are registered
+PEDIGREE_PAGE_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Seconds a cached training page stays valid (workouts are added during race week)
+TRAINING_PAGE_CACHE_TTL = 12 * 60 * 60
+
 # Time in seconds to wait for dynamic content to load in Selenium
 SELENIUM_WAIT_TIME = 10
@@ -4,7 +4,8 @@ Headless browser module with robust WebDriver initialization and fallback mechan
 import os
 import time
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -25,6 +26,13 @@ MAX_LOAD_RETRIES = 3
 # Delay between retries (seconds)
 RETRY_DELAY = 2
 
+# URL patterns of resources not needed when only the DOM is read (images, styles, fonts, ads/analytics)
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.css", "*.woff", "*.woff2", "*.ttf",
+    "*googletagmanager*", "*google-analytics*", "*doubleclick*",
+]
+
 
 def initialize_driver_with_fallback() -> Optional[WebDriver]:
     """
@@ -191,3 +199,34 @@ def safe_get_with_retry(driver: WebDriver, url: str) -> bool:
     
     logger.error(f"Failed to load {url} after {MAX_LOAD_RETRIES} attempts")
     return False
+
+
+@contextmanager
+def blocked_resources(driver: WebDriver) -> Iterator[bool]:
+    """
+    Block BLOCKED_RESOURCE_PATTERNS for page loads within the block via Chrome DevTools.
+    
+    The block list is cleared again on exit, so a driver shared with scrapers that need
+    styles (e.g. to click elements) is left unchanged.
+    
+    Args:
+        driver: WebDriver instance
+        
+    Yields:
+        True if resources are being blocked, False if the driver does not support CDP
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS})
+    except Exception as e:
+        logger.debug(f"Could not block resources via CDP: {e}")
+        yield False
+        return
+    
+    try:
+        yield True
+    finally:
+        try:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        except Exception as e:
+            logger.warning(f"Could not clear CDP resource block list: {e}")
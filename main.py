@@ -6,18 +6,16 @@ import json
 import os
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 from config import BASE_URL_NETKEIBA
 from logger_config import get_logger
-from utils import initialize_driver, get_soup
+from utils import initialize_driver, get_soup, parse_html
 
 from scrapers.race_scraper import scrape_race_info, scrape_detailed_race_results, scrape_course_details
 from scrapers.horse_scraper import (
+    HORSE_LINK_RE,
     scrape_horse_list,
-    scrape_horse_details,
-    scrape_horse_results,
-    scrape_pedigree,
+    scrape_horses_all,
     scrape_training,
 )
 from scrapers.jockey_scraper import scrape_jockey_profile
@@ -79,16 +77,17 @@ def main(race_id):
         race_shutuba_url = f"https://race.netkeiba.com/race/shutuba.html?race_id={race_id}"
         logger.info(f"出馬表ページを取得中: {race_shutuba_url}")
         
-        if driver:
+        # The shutuba page is server-rendered, so plain HTTP is tried first; Selenium is only
+        # used when the static HTML lacks the horse list
+        race_soup = get_soup(race_shutuba_url)
+        if driver and (not race_soup or not race_soup.find("a", href=HORSE_LINK_RE)):
+            logger.info("静的HTMLに出走馬リストがないため、Seleniumで出馬表ページを取得します")
             try:
                 driver.get(race_shutuba_url)
-                race_soup = BeautifulSoup(driver.page_source, "html.parser")
+                race_soup = parse_html(driver.page_source)
                 logger.info("出馬表ページの取得に成功しました（Selenium使用）")
             except Exception as e:
                 logger.warning(f"Seleniumでの出馬表ページ取得に失敗: {e}")
-                race_soup = get_soup(race_shutuba_url)
-        else:
-            race_soup = get_soup(race_shutuba_url)
             
         if not race_soup or "レース情報が見つかりませんでした" in race_soup.text:
             race_db_url = f"{BASE_URL_NETKEIBA}/race/{race_id}"
@@ -150,6 +149,8 @@ def main(race_id):
 
         logger.info(f"{len(horses_summary)}頭の詳細情報を取得中...")
         all_horse_details = []
+        # Profile, results and pedigree pages of all horses are fetched in parallel up front
+        horse_pages_by_id = scrape_horses_all([horse_sum["horse_id"] for horse_sum in horses_summary if "horse_id" in horse_sum])
         for i, horse_sum in enumerate(horses_summary):
             horse_id_str = horse_sum.get('horse_id', '不明')
             horse_name = horse_sum.get('horse_name', '不明')
@@ -158,14 +159,10 @@ def main(race_id):
 
             if 'horse_id' in horse_sum:
                 horse_id = horse_sum["horse_id"]
-                details = scrape_horse_details(horse_id)
-                merged_details.update(details)  # Merge details
-
-                horse_results = scrape_horse_results(horse_id)
-                merged_details["full_results_data"] = horse_results
-
-                pedigree_data = scrape_pedigree(horse_id)
-                merged_details["pedigree_data"] = pedigree_data
+                horse_pages = horse_pages_by_id[horse_id]
+                merged_details.update(horse_pages["details"])  # Merge details
+                merged_details["full_results_data"] = horse_pages["results"]
+                merged_details["pedigree_data"] = horse_pages["pedigree"]
 
                 training_data = scrape_training(driver, horse_id)
                 merged_details["training_data"] = training_data
@@ -4,15 +4,45 @@ Advanced probability models for horse racing prediction.
 This module implements sophisticated probability estimation techniques based on the strategic framework
 in docs/main.md, including Bayesian estimation, conditional probabilities, and Monte Carlo simulation.
 """
-import math
-import random
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 
 from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+PACE_SCENARIO_COLUMNS = {"fast": 0, "balanced": 1, "slow": 2}
+ADVANTAGE_CODES = {"advantage": 1, "disadvantage": -1}
+
+
+class _ProbabilityView(Mapping):
+    """
+    Read-only view of simulated combination probabilities.
+    
+    Keys are "a-b" / "a-b-c" strings as in the rest of the codebase; each probability is
+    computed from the underlying tuple-keyed counts only when it is accessed.
+    """
+
+    def __init__(self, counts: Dict[Tuple[str, ...], int], num_simulations: int):
+        self._counts = counts
+        self._num_simulations = num_simulations
+
+    def __getitem__(self, combo: str) -> float:
+        if not isinstance(combo, str):
+            raise KeyError(combo)
+        return self._counts[tuple(combo.split("-"))] / self._num_simulations
+
+    def __iter__(self) -> Iterator[str]:
+        return ("-".join(combo) for combo in self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Materialize the view, e.g. for JSON serialization."""
+        return {"-".join(combo): count / self._num_simulations for combo, count in self._counts.items()}
+
 
 class ProbabilityModels:
     """
@@ -40,9 +70,66 @@ class ProbabilityModels:
         self.trifecta_probabilities = {}
         self.trio_probabilities = {}
         
+        self._build_factor_arrays()
+        
+        self._priors_cache_key = None
+        self._priors_cache = {}
         self.market_priors = self._calculate_market_priors()
         
         self.simulation_results = {}
+        
+        self._rng = np.random.default_rng()
+        self._sim_scales_key = None
+        self._sim_scales = np.empty(0)
+        self._sim_umabans = []
+        self._mc_raw = np.empty((0, 0))
+
+    def _build_factor_arrays(self) -> None:
+        """
+        Pack the per-horse factor analysis into column arrays.
+        
+        Row i of every array belongs to the i-th horse in factor_analysis; an extra trailing
+        row holds neutral values so that horses without analysis can be looked up with index -1.
+        Scores are scaled to 0-1 (0.5 when missing) and advantages are encoded as -1/0/1.
+        """
+        self._factor_umabans = list(self.factor_analysis.keys())
+        self._horse_idx = {umaban: i for i, umaban in enumerate(self._factor_umabans)}
+        analyses = [self.factor_analysis[umaban] for umaban in self._factor_umabans] + [{}]
+        
+        def score_column(factor: str, field: str) -> np.ndarray:
+            return np.array([analysis.get(factor, {}).get(field, 50) / 100.0 for analysis in analyses])
+        
+        def advantage_column(factor: str, field: str) -> np.ndarray:
+            return np.array([ADVANTAGE_CODES.get(analysis.get(factor, {}).get(field), 0) for analysis in analyses],
+                            dtype=np.int8)
+        
+        self._finishing_kick = score_column("lap_time_analysis", "finishing_kick_score")
+        self._pedigree_score = score_column("pedigree_assessment", "overall_score")
+        self._bias_score = score_column("track_bias_impact", "bias_score")
+        self._pace_scores = np.column_stack([
+            score_column("pace_adaptability", "fast_pace_score"),
+            score_column("pace_adaptability", "balanced_pace_score"),
+            score_column("pace_adaptability", "slow_pace_score"),
+        ])
+        self._weather_advantage = advantage_column("weather_impact", "weather_advantage")
+        self._distance_advantage = advantage_column("distance_aptitude", "distance_advantage")
+        self._bias_advantage = advantage_column("track_bias_impact", "bias_advantage")
+        self._total_score = score_column("factor_scores", "total_score")
+        
+        race_umabans = {horse.get("umaban") for horse in self.horses}
+        self._in_race = np.array([umaban in race_umabans for umaban in self._factor_umabans] + [False])
+
+    def _factor_rows(self, umabans: List[str]) -> np.ndarray:
+        """
+        Map horse numbers to rows of the factor arrays.
+        
+        Args:
+            umabans: Horse numbers to look up
+            
+        Returns:
+            Array of row indices, -1 (the neutral row) for horses without factor analysis
+        """
+        return np.array([self._horse_idx.get(umaban, -1) for umaban in umabans], dtype=np.intp)
 
     def _calculate_market_priors(self) -> Dict[str, float]:
         """
@@ -62,25 +149,32 @@ class ProbabilityModels:
                     priors[umaban] = 1.0 / self.horse_count
             return priors
         
-        total_implied_prob = 0
-        implied_probs = {}
+        key = tuple(sorted(tan_odds.items()))  # The odds themselves, so two fields can never share an entry
+        if key == self._priors_cache_key:
+            return self._priors_cache
+        
+        umabans = []
+        odds_values = []
         
         for umaban, odds_str in tan_odds.items():
             try:
-                odds = float(odds_str)
-                implied_prob = 1.0 / odds
-                implied_probs[umaban] = implied_prob
-                total_implied_prob += implied_prob
+                odds_values.append(float(odds_str))
+                umabans.append(umaban)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid odds format for horse {umaban}: {odds_str}")
         
-        if total_implied_prob > 0:
-            for umaban, prob in implied_probs.items():
-                priors[umaban] = prob / total_implied_prob
+        if odds_values:
+            implied_probs = 1.0 / np.fromiter(odds_values, float, len(odds_values))
+            total_implied_prob = implied_probs.sum()
+            if total_implied_prob > 0:
+                priors = dict(zip(umabans, (implied_probs / total_implied_prob).tolist()))
+        
+        self._priors_cache_key = key
+        self._priors_cache = priors
         
         return priors
 
-    def estimate_all_probabilities(self) -> Dict[str, Dict[str, float]]:
+    def estimate_all_probabilities(self) -> Dict[str, Mapping]:
         """
         Estimate probabilities for all bet types using multiple models.
         
@@ -91,9 +185,7 @@ class ProbabilityModels:
         
         self.win_probabilities = self.bayesian_win_probability()
         
-        self.place_probabilities = self.estimate_place_probabilities()
-        
-        self.show_probabilities = self.estimate_show_probabilities()
+        self.place_probabilities, self.show_probabilities = self._estimate_place_and_show_probabilities()
         
         self._run_monte_carlo_simulation(10000)
         
@@ -123,7 +215,7 @@ class ProbabilityModels:
         """
         logger.info("Estimating win probabilities using Bayesian model...")
         
-        posterior_probs = self.market_priors.copy()
+        self.market_priors = self._calculate_market_priors()
         
         factor_weights = {
             "lap_time_analysis": 0.15,
@@ -136,80 +228,36 @@ class ProbabilityModels:
             "factor_scores": 0.10
         }
         
-        for umaban, analysis in self.factor_analysis.items():
-            if umaban not in posterior_probs:
-                continue
-                
-            prior_prob = posterior_probs[umaban]
-            likelihood_ratio = 1.0
-            
-            for factor, weight in factor_weights.items():
-                if factor not in analysis:
-                    continue
-                    
-                factor_data = analysis[factor]
-                
-                if factor == "lap_time_analysis":
-                    if "finishing_kick_score" in factor_data:
-                        score = factor_data["finishing_kick_score"] / 100.0
-                        likelihood_ratio *= 1.0 + (score - 0.5) * weight * 2
-                
-                elif factor == "pedigree_assessment":
-                    if "overall_score" in factor_data:
-                        score = factor_data["overall_score"] / 100.0
-                        likelihood_ratio *= 1.0 + (score - 0.5) * weight * 2
-                
-                elif factor == "track_bias_impact":
-                    if "bias_score" in factor_data:
-                        score = factor_data["bias_score"] / 100.0
-                        likelihood_ratio *= 1.0 + (score - 0.5) * weight * 2
-                
-                elif factor == "pace_adaptability":
-                    pace_scenario = "balanced_pace_score"  # Default
-                    for race_horse in self.horses:
-                        if race_horse.get("umaban") == umaban:
-                            race_analysis = self.race_data.get("race_analysis", {})
-                            if "pace_scenario" in race_analysis:
-                                scenario = race_analysis["pace_scenario"]
-                                if scenario == "fast":
-                                    pace_scenario = "fast_pace_score"
-                                elif scenario == "slow":
-                                    pace_scenario = "slow_pace_score"
-                            break
-                    
-                    if pace_scenario in factor_data:
-                        score = factor_data[pace_scenario] / 100.0
-                        likelihood_ratio *= 1.0 + (score - 0.5) * weight * 2
-                
-                elif factor == "weather_impact":
-                    if "weather_advantage" in factor_data:
-                        advantage = factor_data["weather_advantage"]
-                        if advantage == "advantage":
-                            likelihood_ratio *= 1.0 + weight
-                        elif advantage == "disadvantage":
-                            likelihood_ratio *= 1.0 - weight * 0.5
-                
-                elif factor == "distance_aptitude":
-                    if "distance_advantage" in factor_data:
-                        advantage = factor_data["distance_advantage"]
-                        if advantage == "advantage":
-                            likelihood_ratio *= 1.0 + weight
-                        elif advantage == "disadvantage":
-                            likelihood_ratio *= 1.0 - weight * 0.5
-                
-                elif factor == "factor_scores":
-                    if "total_score" in factor_data:
-                        score = factor_data["total_score"] / 100.0
-                        likelihood_ratio *= 1.0 + (score - 0.5) * weight * 2
-            
-            posterior_probs[umaban] = prior_prob * likelihood_ratio
+        def score_ratio(scores: np.ndarray, weight: float) -> np.ndarray:
+            return 1.0 + (scores - 0.5) * weight * 2
+        
+        def advantage_ratio(advantages: np.ndarray, weight: float) -> np.ndarray:
+            return np.array([1.0 - weight * 0.5, 1.0, 1.0 + weight])[advantages + 1]
+        
+        race_analysis = self.race_data.get("race_analysis", {})
+        scenario_column = PACE_SCENARIO_COLUMNS.get(race_analysis.get("pace_scenario"), PACE_SCENARIO_COLUMNS["balanced"])
+        pace_columns = np.where(self._in_race, scenario_column, PACE_SCENARIO_COLUMNS["balanced"])
+        pace_scores = self._pace_scores[np.arange(len(pace_columns)), pace_columns]
+        
+        likelihood_ratios = (
+            score_ratio(self._finishing_kick, factor_weights["lap_time_analysis"])
+            * score_ratio(self._pedigree_score, factor_weights["pedigree_assessment"])
+            * score_ratio(self._bias_score, factor_weights["track_bias_impact"])
+            * score_ratio(pace_scores, factor_weights["pace_adaptability"])
+            * advantage_ratio(self._weather_advantage, factor_weights["weather_impact"])
+            * advantage_ratio(self._distance_advantage, factor_weights["distance_aptitude"])
+            * score_ratio(self._total_score, factor_weights["factor_scores"])
+        )
+        
+        umabans = list(self.market_priors.keys())
+        posterior_probs = np.fromiter(self.market_priors.values(), float, len(umabans))
+        posterior_probs *= likelihood_ratios[self._factor_rows(umabans)]
         
-        total_posterior = sum(posterior_probs.values())
+        total_posterior = posterior_probs.sum()
         if total_posterior > 0:
-            for umaban in posterior_probs:
-                posterior_probs[umaban] /= total_posterior
+            posterior_probs /= total_posterior
         
-        return posterior_probs
+        return dict(zip(umabans, posterior_probs.tolist()))
 
     def estimate_place_probabilities(self) -> Dict[str, float]:
         """
@@ -220,22 +268,10 @@ class ProbabilityModels:
         """
         logger.info("Estimating place probabilities...")
         
-        place_probs = {}
+        umabans = list(self.win_probabilities.keys())
+        win_probs = np.fromiter(self.win_probabilities.values(), float, len(umabans))
         
-        for umaban, win_prob in self.win_probabilities.items():
-            if win_prob > 0.3:  # Strong favorite
-                place_probs[umaban] = min(0.8, win_prob * 1.5)
-            elif win_prob > 0.15:  # Contender
-                place_probs[umaban] = min(0.6, win_prob * 2.0)
-            else:  # Longshot
-                place_probs[umaban] = min(0.4, win_prob * 2.5)
-        
-        total_place_prob = sum(place_probs.values())
-        if total_place_prob > 0:
-            for umaban in place_probs:
-                place_probs[umaban] /= total_place_prob
-        
-        return place_probs
+        return dict(zip(umabans, self._scale_place_probabilities(win_probs).tolist()))
 
     def estimate_show_probabilities(self) -> Dict[str, float]:
         """
@@ -246,22 +282,59 @@ class ProbabilityModels:
         """
         logger.info("Estimating show probabilities...")
         
-        show_probs = {}
+        umabans = list(self.place_probabilities.keys())
+        place_probs = np.fromiter(self.place_probabilities.values(), float, len(umabans))
+        win_probs = np.array([self.win_probabilities.get(umaban, 0) for umaban in umabans], dtype=float)
         
-        for umaban, place_prob in self.place_probabilities.items():
-            win_prob = self.win_probabilities.get(umaban, 0)
-            
-            if win_prob > 0.2:  # Strong favorite
-                show_probs[umaban] = min(0.9, place_prob * 1.3)
-            elif win_prob > 0.1:  # Contender
-                show_probs[umaban] = min(0.7, place_prob * 1.5)
-            else:  # Longshot
-                show_probs[umaban] = min(0.5, place_prob * 1.8)
-        
-        total_show_prob = sum(show_probs.values())
+        return dict(zip(umabans, self._scale_show_probabilities(win_probs, place_probs).tolist()))
+
+    def _estimate_place_and_show_probabilities(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Estimate place and show probabilities from a single win probability vector.
+        
+        Returns:
+            Tuple of dictionaries mapping horse numbers to place and show probabilities.
+        """
+        logger.info("Estimating place and show probabilities...")
+        
+        umabans = list(self.win_probabilities.keys())
+        win_probs = np.fromiter(self.win_probabilities.values(), float, len(umabans))
+        place_probs = self._scale_place_probabilities(win_probs)
+        show_probs = self._scale_show_probabilities(win_probs, place_probs)
+        
+        return dict(zip(umabans, place_probs.tolist())), dict(zip(umabans, show_probs.tolist()))
+
+    @staticmethod
+    def _scale_place_probabilities(win_probs: np.ndarray) -> np.ndarray:
+        """
+        Scale win probabilities into normalized place probabilities.
+        
+        Strong favorites (>0.3), contenders (>0.15) and longshots are scaled and capped separately.
+        """
+        place_probs = np.where(win_probs > 0.3, np.minimum(0.8, win_probs * 1.5),
+                               np.where(win_probs > 0.15, np.minimum(0.6, win_probs * 2.0),
+                                        np.minimum(0.4, win_probs * 2.5)))
+        
+        total_place_prob = place_probs.sum()
+        if total_place_prob > 0:
+            place_probs /= total_place_prob
+        
+        return place_probs
+
+    @staticmethod
+    def _scale_show_probabilities(win_probs: np.ndarray, place_probs: np.ndarray) -> np.ndarray:
+        """
+        Scale place probabilities into normalized show probabilities.
+        
+        Strong favorites (win >0.2), contenders (win >0.1) and longshots are scaled and capped separately.
+        """
+        show_probs = np.where(win_probs > 0.2, np.minimum(0.9, place_probs * 1.3),
+                              np.where(win_probs > 0.1, np.minimum(0.7, place_probs * 1.5),
+                                       np.minimum(0.5, place_probs * 1.8)))
+        
+        total_show_prob = show_probs.sum()
         if total_show_prob > 0:
-            for umaban in show_probs:
-                show_probs[umaban] /= total_show_prob
+            show_probs /= total_show_prob
         
         return show_probs
 
@@ -269,6 +342,10 @@ class ProbabilityModels:
         """
         Run Monte Carlo simulation to estimate exotic bet probabilities.
         
+        The unit exponential draws are kept between runs and only regenerated when the field
+        size or simulation count changes, so re-estimating after an odds update just rescales
+        the existing draws by the new scales.
+        
         Args:
             num_simulations: Number of race simulations to run
         """
@@ -279,58 +356,49 @@ class ProbabilityModels:
         trifecta_counts = {}
         trio_counts = {}
         
-        horse_numbers = list(self.win_probabilities.keys())
-        
-        for _ in range(num_simulations):
-            horse_values = {}
-            for umaban in horse_numbers:
-                win_prob = self.win_probabilities.get(umaban, 0.001)
-                
-                lambda_param = -math.log(win_prob) * 5
-                random_value = random.expovariate(lambda_param)
-                
-                if umaban in self.factor_analysis:
-                    analysis = self.factor_analysis[umaban]
-                    
-                    pace_adaptability = analysis.get("pace_adaptability", {})
-                    race_analysis = self.race_data.get("race_analysis", {})
-                    pace_scenario = race_analysis.get("pace_scenario", "balanced")
-                    
-                    if pace_scenario == "fast" and "fast_pace_score" in pace_adaptability:
-                        score = pace_adaptability["fast_pace_score"] / 100.0
-                        random_value *= 1.0 - (score - 0.5) * 0.3
-                    elif pace_scenario == "slow" and "slow_pace_score" in pace_adaptability:
-                        score = pace_adaptability["slow_pace_score"] / 100.0
-                        random_value *= 1.0 - (score - 0.5) * 0.3
-                    
-                    track_bias = analysis.get("track_bias_impact", {})
-                    if "bias_advantage" in track_bias:
-                        advantage = track_bias["bias_advantage"]
-                        if advantage == "advantage":
-                            random_value *= 0.9
-                        elif advantage == "disadvantage":
-                            random_value *= 1.1
-                
-                horse_values[umaban] = random_value
+        scales = self._simulation_scales()
+        horse_numbers = self._sim_umabans
+        horse_count = len(horse_numbers)
+        
+        if horse_count >= 3:
+            rows = self._factor_rows(horse_numbers)
+            
+            race_analysis = self.race_data.get("race_analysis", {})
+            pace_scenario = race_analysis.get("pace_scenario", "balanced")
+            adjustments = np.ones(horse_count)
+            if pace_scenario in ("fast", "slow"):
+                pace_scores = self._pace_scores[rows, PACE_SCENARIO_COLUMNS[pace_scenario]]
+                adjustments *= 1.0 - (pace_scores - 0.5) * 0.3
+            adjustments *= np.array([1.1, 1.0, 0.9])[self._bias_advantage[rows] + 1]
             
-            sorted_horses = sorted(horse_values.items(), key=lambda x: x[1])
+            if self._mc_raw.shape != (num_simulations, horse_count):
+                self._mc_raw = self._rng.standard_exponential((num_simulations, horse_count))
+            values = self._mc_raw * (scales * adjustments)
             
-            if len(sorted_horses) >= 3:
-                first = sorted_horses[0][0]
-                second = sorted_horses[1][0]
-                third = sorted_horses[2][0]
-                
-                exacta_key = f"{first}-{second}"
-                exacta_counts[exacta_key] = exacta_counts.get(exacta_key, 0) + 1
-                
-                quinella_key = "-".join(sorted([first, second]))
-                quinella_counts[quinella_key] = quinella_counts.get(quinella_key, 0) + 1
-                
-                trifecta_key = f"{first}-{second}-{third}"
-                trifecta_counts[trifecta_key] = trifecta_counts.get(trifecta_key, 0) + 1
-                
-                trio_key = "-".join(sorted([first, second, third]))
-                trio_counts[trio_key] = trio_counts.get(trio_key, 0) + 1
+            top_three = np.argpartition(values, 2, axis=1)[:, :3]
+            top_values = np.take_along_axis(values, top_three, axis=1)
+            top_three = np.take_along_axis(top_three, np.argsort(top_values, axis=1), axis=1)
+            
+            # Horses are renumbered by string order so that sorted rows match the sorted umaban keys
+            string_order = sorted(range(horse_count), key=horse_numbers.__getitem__)
+            string_rank = np.empty(horse_count, dtype=np.min_scalar_type(horse_count - 1))
+            string_rank[string_order] = np.arange(horse_count)
+            ranked_umabans = [horse_numbers[i] for i in string_order]
+            finishers = string_rank[top_three]
+            
+            exacta_rows, exacta_observed = np.unique(finishers[:, :2], axis=0, return_counts=True)
+            quinella_rows, quinella_observed = np.unique(np.sort(finishers[:, :2], axis=1), axis=0, return_counts=True)
+            trifecta_rows, trifecta_observed = np.unique(finishers, axis=0, return_counts=True)
+            trio_rows, trio_observed = np.unique(np.sort(finishers, axis=1), axis=0, return_counts=True)
+            
+            for combo_rows, combo_counts, counts in (
+                (exacta_rows, exacta_observed.tolist(), exacta_counts),
+                (quinella_rows, quinella_observed.tolist(), quinella_counts),
+                (trifecta_rows, trifecta_observed.tolist(), trifecta_counts),
+                (trio_rows, trio_observed.tolist(), trio_counts),
+            ):
+                for combo, count in zip(combo_rows.tolist(), combo_counts):
+                    counts[tuple(ranked_umabans[i] for i in combo)] = count
         
         self.simulation_results = {
             "exacta_counts": exacta_counts,
@@ -344,69 +412,45 @@ class ProbabilityModels:
                    f"{len(quinella_counts)} quinella, {len(trifecta_counts)} trifecta, "
                    f"and {len(trio_counts)} trio combinations")
 
-    def estimate_exacta_probabilities(self) -> Dict[str, float]:
+    def estimate_exacta_probabilities(self) -> Mapping:
         """
         Estimate exacta probabilities based on simulation results.
         
         Returns:
-            Dictionary mapping horse number combinations to exacta probabilities.
+            Lazy mapping from horse number combinations to exacta probabilities.
         """
-        exacta_probs = {}
-        exacta_counts = self.simulation_results.get("exacta_counts", {})
-        num_simulations = self.simulation_results.get("num_simulations", 1)
-        
-        for combo, count in exacta_counts.items():
-            exacta_probs[combo] = count / num_simulations
-        
-        return exacta_probs
+        return _ProbabilityView(self.simulation_results.get("exacta_counts", {}),
+                                self.simulation_results.get("num_simulations", 1))
 
-    def estimate_quinella_probabilities(self) -> Dict[str, float]:
+    def estimate_quinella_probabilities(self) -> Mapping:
         """
         Estimate quinella probabilities based on simulation results.
         
         Returns:
-            Dictionary mapping horse number combinations to quinella probabilities.
+            Lazy mapping from horse number combinations to quinella probabilities.
         """
-        quinella_probs = {}
-        quinella_counts = self.simulation_results.get("quinella_counts", {})
-        num_simulations = self.simulation_results.get("num_simulations", 1)
-        
-        for combo, count in quinella_counts.items():
-            quinella_probs[combo] = count / num_simulations
-        
-        return quinella_probs
+        return _ProbabilityView(self.simulation_results.get("quinella_counts", {}),
+                                self.simulation_results.get("num_simulations", 1))
 
-    def estimate_trifecta_probabilities(self) -> Dict[str, float]:
+    def estimate_trifecta_probabilities(self) -> Mapping:
         """
         Estimate trifecta probabilities based on simulation results.
         
         Returns:
-            Dictionary mapping horse number combinations to trifecta probabilities.
+            Lazy mapping from horse number combinations to trifecta probabilities.
         """
-        trifecta_probs = {}
-        trifecta_counts = self.simulation_results.get("trifecta_counts", {})
-        num_simulations = self.simulation_results.get("num_simulations", 1)
-        
-        for combo, count in trifecta_counts.items():
-            trifecta_probs[combo] = count / num_simulations
-        
-        return trifecta_probs
+        return _ProbabilityView(self.simulation_results.get("trifecta_counts", {}),
+                                self.simulation_results.get("num_simulations", 1))
 
-    def estimate_trio_probabilities(self) -> Dict[str, float]:
+    def estimate_trio_probabilities(self) -> Mapping:
         """
         Estimate trio probabilities based on simulation results.
         
         Returns:
-            Dictionary mapping horse number combinations to trio probabilities.
+            Lazy mapping from horse number combinations to trio probabilities.
         """
-        trio_probs = {}
-        trio_counts = self.simulation_results.get("trio_counts", {})
-        num_simulations = self.simulation_results.get("num_simulations", 1)
-        
-        for combo, count in trio_counts.items():
-            trio_probs[combo] = count / num_simulations
-        
-        return trio_probs
+        return _ProbabilityView(self.simulation_results.get("trio_counts", {}),
+                                self.simulation_results.get("num_simulations", 1))
 
     def conditional_probability(self, condition_func, target_func) -> float:
         """
@@ -422,8 +466,11 @@ class ProbabilityModels:
         condition_count = 0
         target_and_condition_count = 0
         
-        for _ in range(1000):  # Use a smaller number of simulations for efficiency
-            result = self._simulate_race()
+        finishing_orders = self._simulate_races(1000)  # Use a smaller number of simulations for efficiency
+        umabans = self._sim_umabans
+        
+        for order in finishing_orders.tolist():
+            result = [umabans[i] for i in order]
             
             if condition_func(result):
                 condition_count += 1
@@ -435,6 +482,41 @@ class ProbabilityModels:
         
         return target_and_condition_count / condition_count
 
+    def _simulation_scales(self) -> np.ndarray:
+        """
+        Get the exponential scale (1 / rate) of each horse for race simulation.
+        
+        A horse with win probability p finishes at Exp(rate = -5 * log(p)), i.e. a unit
+        exponential draw times -1 / (5 * log(p)). The scales are cached and only rebuilt
+        when the win probabilities change.
+        
+        Returns:
+            Array of scales aligned with self._sim_umabans
+        """
+        key = tuple(self.win_probabilities.items())
+        if key != self._sim_scales_key:
+            self._sim_umabans = list(self.win_probabilities.keys())
+            win_probs = np.fromiter(self.win_probabilities.values(), float, len(self._sim_umabans))
+            self._sim_scales = np.where(win_probs > 0, -1.0 / (5.0 * np.log(np.maximum(win_probs, 1e-9))), 1e6)
+            self._sim_scales_key = key
+        
+        return self._sim_scales
+
+    def _simulate_races(self, num_races: int) -> np.ndarray:
+        """
+        Simulate a batch of races and return the finishing orders.
+        
+        Args:
+            num_races: Number of races to simulate
+            
+        Returns:
+            Array of shape (num_races, horses) holding indices into self._sim_umabans in finishing order
+        """
+        scales = self._simulation_scales()
+        values = self._rng.standard_exponential((num_races, len(scales))) * scales
+        
+        return np.argsort(values, axis=1)
+
     def _simulate_race(self) -> List[str]:
         """
         Simulate a single race and return the finishing order.
@@ -442,12 +524,6 @@ class ProbabilityModels:
         Returns:
             List of horse numbers in finishing order
         """
-        horse_values = {}
-        for umaban, win_prob in self.win_probabilities.items():
-            lambda_param = -math.log(win_prob) * 5
-            random_value = random.expovariate(lambda_param)
-            horse_values[umaban] = random_value
-        
-        sorted_horses = sorted(horse_values.items(), key=lambda x: x[1])
+        finishing_order = self._simulate_races(1)[0]
         
-        return [horse[0] for horse in sorted_horses]
+        return [self._sim_umabans[i] for i in finishing_order]
@@ -4,14 +4,214 @@ Race selection module for horse racing prediction.
 This module implements race selection functionality based on the strategic framework
 in docs/main.md, helping identify races with the highest potential for value betting.
 """
+import bisect
 import re
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
 
 from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+OVERROUND_BUCKETS = np.array([0.15, 0.2, 0.3])  # Upper bounds (inclusive) of each overround band
+MARKET_SCORE_TABLE = np.array([50.0, 70.0, 80.0, 90.0])  # Market inefficiency score per overround band
+
+FIELD_SIZE_LUT_MIN_LENGTH = 32
+
+DATA_AVAILABILITY_CHECKS = 6
+# Data availability score for each bitmask of passed checks (see _data_availability_mask)
+DATA_AVAILABILITY_SCORES = np.array([
+    bin(mask).count("1") / DATA_AVAILABILITY_CHECKS * 100 for mask in range(1 << DATA_AVAILABILITY_CHECKS)
+])
+
+# Score components in the column order used by batch scoring
+SCORE_COMPONENTS = (
+    "field_size",
+    "race_class",
+    "track_condition",
+    "market_inefficiency",
+    "data_availability",
+    "historical_edge",
+)
+
+
+def _parse_odds(odds_values: Iterable[Any]) -> np.ndarray:
+    """Convert odds values to a float array, dropping entries that are not numbers."""
+    parsed = []
+    for odds_str in odds_values:
+        try:
+            parsed.append(float(odds_str))
+        except (ValueError, TypeError):
+            pass
+    return np.asarray(parsed, dtype=np.float64)
+
+DISTANCE_PATTERN = re.compile(r"\d+")
+RACE_DATE_PATTERN = re.compile(r"(\d{4})(?:-(\d{1,2})-(\d{1,2})|/(\d{1,2})/(\d{1,2})|年(\d{1,2})月(\d{1,2})日)")
+
+
+def _parse_distance(distance: Any) -> int:
+    """Convert a distance such as 1600 or "1600m" to meters, 0 if it cannot be read."""
+    if isinstance(distance, (int, float)):
+        return int(distance)
+    match = DISTANCE_PATTERN.search(distance) if isinstance(distance, str) else None
+    return int(match.group(0)) if match else 0
+
+
+def _compile_substring_matcher(substrings: Iterable[str]) -> Optional["re.Pattern"]:
+    """Compile one alternation matching any of the substrings, None if there are none to match."""
+    substrings = list(substrings)
+    if not substrings:
+        return None
+    return re.compile("|".join(re.escape(substring) for substring in substrings))
+
+
+def _contains_any(matcher: Optional["re.Pattern"], text: str) -> bool:
+    """Check whether text contains any substring compiled into the matcher."""
+    if matcher is None:
+        return False
+    return matcher.search(text) is not None
+
+
+def _parse_race_date(date_str: Any) -> np.datetime64:
+    """Convert a YYYY-MM-DD, YYYY/MM/DD or YYYY年MM月DD日 date to datetime64, NaT if it cannot be read."""
+    match = RACE_DATE_PATTERN.fullmatch(date_str) if isinstance(date_str, str) else None
+    if not match:
+        return np.datetime64("NaT", "D")
+    
+    year, *month_day = match.groups()
+    month, day = [int(value) for value in month_day if value is not None]
+    try:
+        return np.datetime64(datetime(int(year), month, day).date(), "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+class RaceDatabase:
+    """
+    Column-oriented store of the race attributes used for filtering.
+    
+    Every attribute is kept in an array aligned with the race IDs, so filter criteria
+    are evaluated as boolean masks over all races at once.
+    """
+
+    def __init__(self, races: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the database, optionally loading a dictionary of races.
+        
+        Args:
+            races: Dictionary mapping race IDs to race data
+        """
+        self._ids = []
+        self._venues = []
+        self._distances = []
+        self._course_types = []
+        self._field_sizes = []
+        self._race_classes = []
+        self._dates = []
+        self._columns = None
+        
+        for race_id, race_data in (races or {}).items():
+            self.add(race_id, race_data)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, race_id: str, race_data: Dict[str, Any]) -> None:
+        """
+        Add a race to the database.
+        
+        Args:
+            race_id: Race ID
+            race_data: Dictionary containing race data
+        """
+        self._ids.append(race_id)
+        self._venues.append(race_data.get("venue_name"))
+        self._distances.append(_parse_distance(race_data.get("distance_meters", 0)))
+        self._course_types.append(race_data.get("course_type"))
+        self._field_sizes.append(len(race_data.get("horses", [])))
+        self._race_classes.append(race_data.get("race_class") or "")
+        self._dates.append(_parse_race_date(race_data.get("date")))
+        self._columns = None
+
+    def _get_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Get the column arrays, building them after races have been added.
+        
+        Returns:
+            Dictionary mapping attribute names to per-race arrays
+        """
+        if self._columns is None:
+            self._columns = {
+                "ids": np.array(self._ids, dtype=object),
+                "venue": np.array(self._venues, dtype=object),
+                "distance": np.array(self._distances, dtype=np.int32),
+                "course_type": np.array(self._course_types, dtype=object),
+                "field_size": np.array(self._field_sizes, dtype=np.int32),
+                "race_class": np.array(self._race_classes, dtype=object),
+                "date": np.array(self._dates, dtype="datetime64[D]"),
+            }
+        
+        return self._columns
+
+    def filter(self, criteria: Dict[str, Any]) -> List[str]:
+        """
+        Get the IDs of races matching all of the specified criteria.
+        
+        Args:
+            criteria: Dictionary containing filter criteria
+            
+        Returns:
+            List of matching race IDs in insertion order
+        """
+        columns = self._get_columns()
+        mask = np.ones(len(self), dtype=bool)
+        
+        if "venue" in criteria:
+            mask &= columns["venue"] == criteria["venue"]
+        
+        if "race_class" in criteria:
+            race_classes, class_index = np.unique(columns["race_class"], return_inverse=True)
+            class_matcher = _compile_substring_matcher(criteria["race_class"])
+            class_matches = np.array([
+                _contains_any(class_matcher, race_class) for race_class in race_classes
+            ], dtype=bool)
+            mask &= class_matches[class_index.ravel()]
+        
+        if "min_distance" in criteria:
+            mask &= columns["distance"] >= criteria["min_distance"]
+        
+        if "max_distance" in criteria:
+            mask &= columns["distance"] <= criteria["max_distance"]
+        
+        if "course_type" in criteria:
+            mask &= columns["course_type"] == criteria["course_type"]
+        
+        if "min_field_size" in criteria:
+            mask &= columns["field_size"] >= criteria["min_field_size"]
+        
+        if "max_field_size" in criteria:
+            mask &= columns["field_size"] <= criteria["max_field_size"]
+        
+        return columns["ids"][mask].tolist()
+
+    def between_dates(self, start: np.datetime64, end: np.datetime64) -> List[str]:
+        """
+        Get the IDs of races held between two dates.
+        
+        Args:
+            start: First date to include
+            end: Last date to include
+            
+        Returns:
+            List of matching race IDs in insertion order; races without a readable date are skipped
+        """
+        columns = self._get_columns()
+        dates = columns["date"]
+        
+        return columns["ids"][(dates >= start) & (dates <= end)].tolist()
+
 
 class RaceSelector:
     """
@@ -52,6 +252,10 @@ class RaceSelector:
         }
         
         self.race_scores = {}
+        # Race IDs by descending score and their negated scores, rebuilt by score_races
+        self._ranked_race_ids = []
+        self._ranked_neg_scores = []
+        self._refresh_criteria_lookups()
         logger.info("Initialized race selector with default selection criteria")
 
     def set_selection_criteria(self, criteria: Dict[str, Any]) -> None:
@@ -62,8 +266,49 @@ class RaceSelector:
             criteria: Dictionary containing selection criteria parameters
         """
         self.selection_criteria.update(criteria)
+        self._refresh_criteria_lookups()
         logger.info(f"Updated selection criteria: {criteria}")
 
+    def _refresh_criteria_lookups(self) -> None:
+        """
+        Rebuild the lookups derived from the selection criteria.
+        """
+        self._preferred_conditions = frozenset(self.selection_criteria["track_condition"]["preferred"])
+        # Field size score by number of runners; sizes past the end clamp to the last (too many horses) entry
+        min_size = self.selection_criteria["field_size"]["min"]
+        max_size = self.selection_criteria["field_size"]["max"]
+        field_sizes = np.arange(max(FIELD_SIZE_LUT_MIN_LENGTH, int(max_size) + 2))
+        if max_size > min_size:
+            in_range_score = 100 - np.abs((field_sizes - (min_size + max_size) / 2) / ((max_size - min_size) / 2)) * 50
+        else:
+            in_range_score = np.full(len(field_sizes), 100.0)  # Zero-width range: only exactly min_size is in range
+        self._field_size_scores = np.where(field_sizes < min_size, 30,  # Too few horses
+                                           np.where(field_sizes > max_size, 50, in_range_score))  # Too many horses
+        
+        # Component weights in SCORE_COMPONENTS order for the scoring dot product
+        self._weights = np.array([
+            self.selection_criteria.get(component, {}).get("weight", 0) for component in SCORE_COMPONENTS
+        ], dtype=np.float64)
+        self._preferred_class_matcher = _compile_substring_matcher(self.selection_criteria["race_class"]["preferred"])
+        # race_class -> whether it contains a preferred class, filled as classes are seen
+        self._preferred_class_memo = {}
+
+    def _is_preferred_class(self, race_class: str) -> bool:
+        """
+        Check whether a race class contains any preferred class, memoized per distinct class string.
+        
+        Args:
+            race_class: Race class string
+            
+        Returns:
+            True if the race class contains a preferred class
+        """
+        preferred = self._preferred_class_memo.get(race_class)
+        if preferred is None:
+            preferred = _contains_any(self._preferred_class_matcher, race_class)
+            self._preferred_class_memo[race_class] = preferred
+        return preferred
+
     def score_races(self, races: Dict[str, Any]) -> Dict[str, float]:
         """
         Score races based on selection criteria to identify promising opportunities.
@@ -76,13 +321,14 @@ class RaceSelector:
         """
         logger.info(f"Scoring {len(races)} races for betting opportunities...")
         
-        self.race_scores = {}
+        race_ids = list(races.keys())
+        scores = self._score_race_columns(self._pack_races_soa(list(races.values())))
+        self.race_scores = dict(zip(race_ids, scores.tolist()))
+        self._ranked_race_ids = sorted(self.race_scores, key=self.race_scores.get, reverse=True)
+        self._ranked_neg_scores = [-self.race_scores[race_id] for race_id in self._ranked_race_ids]
         
-        for race_id, race_data in races.items():
-            score = self._calculate_race_score(race_data)
-            self.race_scores[race_id] = score
-            
-            race_name = race_data.get("race_name", "Unknown")
+        for race_id, score in self.race_scores.items():
+            race_name = races[race_id].get("race_name", "Unknown")
             logger.info(f"Race {race_id} ({race_name}): Score {score:.1f}/100")
         
         return self.race_scores
@@ -97,56 +343,64 @@ class RaceSelector:
         Returns:
             Opportunity score (0-100)
         """
-        score_components = {}
-        
-        field_size = len(race_data.get("horses", []))
-        min_size = self.selection_criteria["field_size"]["min"]
-        max_size = self.selection_criteria["field_size"]["max"]
-        
-        if field_size < min_size:
-            field_size_score = 30  # Too few horses
-        elif field_size > max_size:
-            field_size_score = 50  # Too many horses
-        else:
-            field_size_score = 100 - abs((field_size - (min_size + max_size) / 2) / ((max_size - min_size) / 2)) * 50
-        
-        score_components["field_size"] = field_size_score
-        
-        race_class = race_data.get("race_class", "")
-        preferred_classes = self.selection_criteria["race_class"]["preferred"]
-        
-        if any(cls in race_class for cls in preferred_classes):
-            class_score = 100
-        else:
-            class_score = 50
-        
-        score_components["race_class"] = class_score
-        
-        track_condition = race_data.get("track_condition", "")
-        preferred_conditions = self.selection_criteria["track_condition"]["preferred"]
-        
-        if track_condition in preferred_conditions:
-            condition_score = 100
-        else:
-            condition_score = 60
-        
-        score_components["track_condition"] = condition_score
+        return float(self._score_race_columns(self._pack_races_soa([race_data]))[0])
+
+    def _pack_races_soa(self, races: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Extract the scoring inputs of each race into column arrays.
         
-        market_score = self._calculate_market_inefficiency_score(race_data)
-        score_components["market_inefficiency"] = market_score
+        Args:
+            races: List of race data dictionaries
+            
+        Returns:
+            Dictionary mapping input names to arrays with one entry per race
+        """
+        return {
+            "field_size": np.array([len(race_data.get("horses", [])) for race_data in races], dtype=np.int32),
+            "preferred_class": np.array([
+                self._is_preferred_class(race_data.get("race_class", "")) for race_data in races
+            ], dtype=bool),
+            "preferred_condition": np.array([
+                race_data.get("track_condition", "") in self._preferred_conditions for race_data in races
+            ], dtype=bool),
+            "market_inefficiency": np.array([
+                self._calculate_market_inefficiency_score(race_data) for race_data in races
+            ], dtype=np.float64),
+            "data_availability_mask": np.array([
+                self._data_availability_mask(race_data) for race_data in races
+            ], dtype=np.uint8),
+            "historical_edge": np.array([
+                self._calculate_historical_edge_score(race_data) for race_data in races
+            ], dtype=np.float64),
+        }
+
+    def _score_race_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Calculate opportunity scores for a batch of races packed by _pack_races_soa.
         
-        data_score = self._calculate_data_availability_score(race_data)
-        score_components["data_availability"] = data_score
+        Args:
+            columns: Dictionary mapping input names to per-race arrays
+            
+        Returns:
+            Array of opportunity scores (0-100)
+        """
+        field_size_score = self._field_size_scores[
+            np.minimum(columns["field_size"], len(self._field_size_scores) - 1)
+        ]
         
-        edge_score = self._calculate_historical_edge_score(race_data)
-        score_components["historical_edge"] = edge_score
+        class_score = np.where(columns["preferred_class"], 100, 50)
+        condition_score = np.where(columns["preferred_condition"], 100, 60)
         
-        weighted_score = 0
-        for component, score in score_components.items():
-            weight = self.selection_criteria.get(component, {}).get("weight", 0)
-            weighted_score += score * weight
+        score_components = np.column_stack([
+            field_size_score,
+            class_score,
+            condition_score,
+            columns["market_inefficiency"],
+            DATA_AVAILABILITY_SCORES[columns["data_availability_mask"]],
+            columns["historical_edge"],
+        ])
         
-        return weighted_score
+        return score_components @ self._weights
 
     def _calculate_market_inefficiency_score(self, race_data: Dict[str, Any]) -> float:
         """
@@ -164,32 +418,16 @@ class RaceSelector:
         if not tan_odds:
             return 50  # Neutral score if no odds data
         
-        implied_probs = {}
-        total_implied_prob = 0
-        
-        for umaban, odds_str in tan_odds.items():
-            try:
-                odds = float(odds_str)
-                implied_prob = 1.0 / odds
-                implied_probs[umaban] = implied_prob
-                total_implied_prob += implied_prob
-            except (ValueError, TypeError):
-                pass
+        implied_probs = _parse_odds(tan_odds.values())
+        np.reciprocal(implied_probs, out=implied_probs)
+        total_implied_prob = implied_probs.sum()
         
         if total_implied_prob == 0:
             return 50
         
         overround = total_implied_prob - 1.0
         
-        if overround > 0.3:  # Very high overround
-            return 90
-        elif overround > 0.2:
-            return 80
-        elif overround > 0.15:
-            return 70
-        else:
-            return 50
-        
+        return float(MARKET_SCORE_TABLE[np.searchsorted(OVERROUND_BUCKETS, overround)])
 
     def _calculate_data_availability_score(self, race_data: Dict[str, Any]) -> float:
         """
@@ -201,29 +439,45 @@ class RaceSelector:
         Returns:
             Data availability score (0-100)
         """
-        score = 0
-        total_checks = 6
+        return float(DATA_AVAILABILITY_SCORES[self._data_availability_mask(race_data)])
+
+    def _data_availability_mask(self, race_data: Dict[str, Any]) -> int:
+        """
+        Build a bitmask of the data availability checks passed by a race.
         
-        if all(key in race_data for key in ["race_name", "venue_name", "course_type", "distance_meters"]):
-            score += 1
+        Bits 0-5: race metadata, pedigree, training, jockey/trainer profiles, live odds, speed figures.
+        The three per-horse checks are evaluated in a single pass over the horses.
         
-        horses = race_data.get("horses", [])
-        if horses and all("horse_name" in horse and "pedigree_data" in horse for horse in horses):
-            score += 1
+        Args:
+            race_data: Dictionary containing race data
+            
+        Returns:
+            Availability bitmask (0-63)
+        """
+        mask = 0
         
-        if horses and all("training_data" in horse and horse["training_data"] for horse in horses):
-            score += 1
+        if all(key in race_data for key in ["race_name", "venue_name", "course_type", "distance_meters"]):
+            mask |= 1 << 0
         
-        if horses and all("jockey_profile" in horse and "trainer_profile" in horse for horse in horses):
-            score += 1
+        horses = race_data.get("horses", [])
+        if horses:
+            has_pedigree = has_training = has_profiles = True
+            for horse in horses:
+                has_pedigree = has_pedigree and "horse_name" in horse and "pedigree_data" in horse
+                has_training = has_training and bool(horse.get("training_data"))
+                has_profiles = has_profiles and "jockey_profile" in horse and "trainer_profile" in horse
+                if not (has_pedigree or has_training or has_profiles):
+                    break
+            
+            mask |= has_pedigree << 1 | has_training << 2 | has_profiles << 3
         
-        if "live_odds_data" in race_data and race_data["live_odds_data"]:
-            score += 1
+        if race_data.get("live_odds_data"):
+            mask |= 1 << 4
         
-        if "speed_figures" in race_data and race_data["speed_figures"]:
-            score += 1
+        if race_data.get("speed_figures"):
+            mask |= 1 << 5
         
-        return (score / total_checks) * 100
+        return mask
 
     def _calculate_historical_edge_score(self, race_data: Dict[str, Any]) -> float:
         """
@@ -258,21 +512,25 @@ class RaceSelector:
             logger.warning("No races have been scored yet")
             return []
         
-        sorted_races = sorted(self.race_scores.items(), key=lambda x: x[1], reverse=True)
+        # Races are ranked once per score_races; races scoring >= min_score form a prefix
+        num_eligible = bisect.bisect_right(self._ranked_neg_scores, -min_score)
         
-        recommended = [
-            {
+        recommended = []
+        for race_id in self._ranked_race_ids[:num_eligible]:
+            if len(recommended) >= limit:
+                break
+            race_data = self.race_database.get(race_id)
+            if race_data is None:
+                continue
+            recommended.append({
                 "race_id": race_id,
-                "score": score,
-                "race_name": self.race_database.get(race_id, {}).get("race_name", "Unknown"),
-                "venue": self.race_database.get(race_id, {}).get("venue_name", "Unknown"),
-                "date": self.race_database.get(race_id, {}).get("date", "Unknown"),
-            }
-            for race_id, score in sorted_races
-            if score >= min_score and race_id in self.race_database
-        ]
+                "score": self.race_scores[race_id],
+                "race_name": race_data.get("race_name", "Unknown"),
+                "venue": race_data.get("venue_name", "Unknown"),
+                "date": race_data.get("date", "Unknown"),
+            })
         
-        return recommended[:limit]
+        return recommended
 
     def filter_races_by_criteria(self, races: Dict[str, Any], criteria: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -285,59 +543,12 @@ class RaceSelector:
         Returns:
             Dictionary of races that match the criteria
         """
-        filtered_races = {}
-        
-        for race_id, race_data in races.items():
-            if self._race_matches_criteria(race_data, criteria):
-                filtered_races[race_id] = race_data
+        matching_ids = RaceDatabase(races).filter(criteria)
+        filtered_races = {race_id: races[race_id] for race_id in matching_ids}
         
         logger.info(f"Filtered {len(races)} races down to {len(filtered_races)} based on criteria")
         return filtered_races
 
-    def _race_matches_criteria(self, race_data: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
-        """
-        Check if a race matches the specified criteria.
-        
-        Args:
-            race_data: Dictionary containing race data
-            criteria: Dictionary containing filter criteria
-            
-        Returns:
-            True if the race matches all criteria, False otherwise
-        """
-        if "venue" in criteria and race_data.get("venue_name") != criteria["venue"]:
-            return False
-        
-        if "race_class" in criteria:
-            race_class = race_data.get("race_class", "")
-            if not any(cls in race_class for cls in criteria["race_class"]):
-                return False
-        
-        if "min_distance" in criteria:
-            distance = race_data.get("distance_meters", 0)
-            if distance < criteria["min_distance"]:
-                return False
-        
-        if "max_distance" in criteria:
-            distance = race_data.get("distance_meters", 0)
-            if distance > criteria["max_distance"]:
-                return False
-        
-        if "course_type" in criteria and race_data.get("course_type") != criteria["course_type"]:
-            return False
-        
-        if "min_field_size" in criteria:
-            field_size = len(race_data.get("horses", []))
-            if field_size < criteria["min_field_size"]:
-                return False
-        
-        if "max_field_size" in criteria:
-            field_size = len(race_data.get("horses", []))
-            if field_size > criteria["max_field_size"]:
-                return False
-        
-        return True
-
     def get_upcoming_races(self, days_ahead: int = 7) -> List[str]:
         """
         Get list of upcoming race IDs within the specified time frame.
@@ -348,29 +559,11 @@ class RaceSelector:
         Returns:
             List of upcoming race IDs
         """
-        upcoming_races = []
-        today = datetime.now().date()
-        
-        for race_id, race_data in self.race_database.items():
-            race_date_str = race_data.get("date")
-            if not race_date_str:
-                continue
-            
-            try:
-                race_date = None
-                date_formats = ["%Y-%m-%d", "%Y/%m/%d", "%Y年%m月%d日"]
-                
-                for fmt in date_formats:
-                    try:
-                        race_date = datetime.strptime(race_date_str, fmt).date()
-                        break
-                    except ValueError:
-                        continue
-                
-                if race_date and today <= race_date <= today + timedelta(days=days_ahead):
-                    upcoming_races.append(race_id)
-            except Exception as e:
-                logger.warning(f"Error parsing date for race {race_id}: {e}")
+        today = np.datetime64(datetime.now().date(), "D")
+        # Packed per call: race_database is a plain dict that callers may change at any time
+        upcoming_races = RaceDatabase(self.race_database).between_dates(
+            today, today + np.timedelta64(days_ahead, "D")
+        )
         
         logger.info(f"Found {len(upcoming_races)} upcoming races in the next {days_ahead} days")
         return upcoming_races
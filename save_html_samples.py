@@ -1,7 +1,11 @@
 import os
 import re
-import time
-from selenium.common.exceptions import WebDriverException
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 # Import WebDriver initialization function from utils
 try:
@@ -21,70 +25,97 @@ TARGET_URLS = [
     "https://race.netkeiba.com/odds/index.html?race_id=202506030811" # Added live odds URL
 ]
 OUTPUT_DIR = "html_samples"
-WAIT_TIME = 5 # Seconds to wait for page load
+WAIT_TIME = 5 # Maximum seconds to wait for page load
+MAX_WORKERS = 4 # Concurrent WebDriver instances
+
+# Precompiled patterns for filename generation
+PROTOCOL_RE = re.compile(r'^https?://')
+UNDERSCORE_RUN_RE = re.compile(r'_+')
+SEPARATOR_TABLE = str.maketrans('/:?=&%', '______')
 
 # --- Helper Function ---
 def generate_filename_from_url(url):
     """Generates a safe filename from a URL."""
     # Remove protocol
-    name = re.sub(r'^https?://', '', url)
+    name = PROTOCOL_RE.sub('', url)
     # Replace common separators and invalid characters with underscores
-    name = re.sub(r'[/:?=&%]', '_', name)
+    name = name.translate(SEPARATOR_TABLE)
     # Remove potentially problematic trailing characters or multiple underscores
-    name = re.sub(r'_+', '_', name).strip('_')
+    name = UNDERSCORE_RUN_RE.sub('_', name).strip('_')
     # Limit length if necessary (optional)
     # max_len = 100
     # name = name[:max_len]
     return f"{name}.html"
 
-# --- Main Execution ---
-if __name__ == "__main__":
-    print(f"Creating output directory: {OUTPUT_DIR}")
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+# --- Worker Drivers ---
+_thread_state = threading.local()
+_drivers = []
+_drivers_lock = threading.Lock()
 
-    driver = None
-    try:
-        print("Initializing WebDriver...")
+def get_thread_driver():
+    """Returns the WebDriver owned by the current worker thread, initializing it on first use."""
+    driver = getattr(_thread_state, "driver", None)
+    if driver is None:
+        print(f"Initializing WebDriver for {threading.current_thread().name}...")
         driver = initialize_driver()
-        print("WebDriver initialized.")
+        if driver is None:
+            raise WebDriverException("WebDriver initialization failed.")
+        _thread_state.driver = driver
+        with _drivers_lock:
+            _drivers.append(driver)
+    return driver
 
-        # Ensure driver is not None before proceeding
-        if driver:
-            for url in TARGET_URLS:
-                filename = generate_filename_from_url(url)
-                filepath = os.path.join(OUTPUT_DIR, filename)
+def fetch_and_save(url):
+    """Fetches a URL with the current worker's WebDriver and saves its page source."""
+    filename = generate_filename_from_url(url)
+    filepath = os.path.join(OUTPUT_DIR, filename)
 
-                # Indent the following block to be inside the loop
-                print(f"\nFetching URL: {url}")
-                try:
-                    driver.get(url)
-                    print(f"Waiting {WAIT_TIME} seconds for page to load...")
-                    time.sleep(WAIT_TIME) # Move sleep inside try
+    print(f"\nFetching URL: {url}")
+    try:
+        driver = get_thread_driver()
+        driver.get(url)
+        print(f"Waiting up to {WAIT_TIME} seconds for page body: {url}")
+        WebDriverWait(driver, WAIT_TIME).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
 
-                    print("Getting page source...")
-                    html_content = driver.page_source # Move page_source inside try
+        # Encode once and write bytes, bypassing the text-mode writer
+        html_bytes = driver.page_source.encode("utf-8", errors="replace")
 
-                    print(f"Saving HTML to: {filepath}")
-                    with open(filepath, "w", encoding="utf-8") as f: # Move file writing inside try
-                        f.write(html_content)
-                    print("Saved successfully.")
+        print(f"Saving HTML to: {filepath}")
+        with open(filepath, "wb") as f:
+            f.write(html_bytes)
+        print(f"Saved successfully: {filepath}")
 
-                # Correctly indented except blocks
-                except WebDriverException as e:
-                        print(f"Error accessing URL {url}: {e}")
-                except IOError as e:
-                        print(f"Error writing file {filepath}: {e}")
-                except Exception as e:
-                     print(f"An unexpected error occurred for URL {url}: {e}")
-        else:
-            print("WebDriver initialization failed. Cannot fetch URLs.")
+    except TimeoutException:
+        print(f"Timed out waiting for page body: {url}")
+    except WebDriverException as e:
+        print(f"Error accessing URL {url}: {e}")
+    except IOError as e:
+        print(f"Error writing file {filepath}: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred for URL {url}: {e}")
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    print(f"Creating output directory: {OUTPUT_DIR}")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    try:
+        print(f"Fetching {len(TARGET_URLS)} URLs with {MAX_WORKERS} workers...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            list(executor.map(fetch_and_save, TARGET_URLS))
 
     except Exception as e:
-        print(f"An error occurred during WebDriver initialization or processing: {e}")
+        print(f"An error occurred during processing: {e}")
     finally:
-        if driver:
-            print("\nQuitting WebDriver...")
-            driver.quit()
-            print("WebDriver quit.")
+        if _drivers:
+            print("\nQuitting WebDrivers...")
+            for driver in _drivers:
+                try:
+                    driver.quit()
+                except WebDriverException as e:
+                    print(f"Error quitting WebDriver: {e}")
+            print("WebDrivers quit.")
 
     print("\nHTML sample saving process finished.")
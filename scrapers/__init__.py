@@ -4,9 +4,12 @@
 # from .race_scraper import scrape_race_info, scrape_detailed_race_results
 # from .horse_scraper import (
 #     scrape_horse_list,
+#     scrape_horse_lists,
 #     scrape_horse_details,
 #     scrape_horse_results,
 #     scrape_pedigree,
+#     scrape_horse_all,
+#     scrape_horses_all,
 #     scrape_training,
 # )
 # from .jockey_scraper import scrape_jockey_profile
@@ -1,83 +1,440 @@
 """
 Scraping functions related to race day announcements and news.
 """
+import os
+import queue
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from bs4 import BeautifulSoup, Tag
+from io import BytesIO
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from lxml import etree
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from typing import Dict, Any, List
 
-from utils import clean_text
+from headless_browser import blocked_resources
 from logger_config import get_logger
-from config import SELENIUM_WAIT_TIME
+from utils import clean_text, get_html
+from config import ANNOUNCEMENT_CACHE_DIR, ANNOUNCEMENT_CACHE_TTL, RACE_NEWS_URL, SELENIUM_WAIT_TIME
 
 logger = get_logger(__name__)
 
+# Maximum number of news pages kept in memory
+ANNOUNCEMENT_MEMORY_CACHE_SIZE = 4096
 
-def scrape_race_announcements(driver: WebDriver, race_id: str) -> Dict[str, Any]:
-    """Scrapes race day announcements and news (A1.12, A5) for a race."""
-    logger.info(f"Scraping race announcements for race {race_id}...")
-    announcement_data = {"race_id": race_id, "announcements": []}
-    announcement_url = f"https://race.netkeiba.com/race/news.html?race_id={race_id}"
+# race_id -> (fetch time, HTML), least recently used first; backed by ANNOUNCEMENT_CACHE_DIR
+_memory_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+# Delay in seconds between the start of consecutive workers in a bulk scrape
+BULK_WORKER_STAGGER = 0.1
+
+# Seconds between checks for the news list while waiting on Selenium (WebDriverWait default: 0.5)
+NEWS_LIST_POLL_FREQUENCY = 0.05
+
+# Class names of the news list markup (both News_Item and NewsItem naming styles appear)
+NEWS_LIST_CLASS = "Race_News_List"
+NEWS_ITEM_CLASSES = ("News_Item", "NewsItem")
+
+# A div carrying the Race_News_List class token, as matched by _is_news_list
+NEWS_LIST_XPATH = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' %s ')]" % NEWS_LIST_CLASS
+)
+
+# Text content of an element, as BeautifulSoup's .text / lxml.html's text_content()
+ELEMENT_TEXT_XPATH = etree.XPath("string()")
+
+# All date/title/text elements of a news item, in document order, in one evaluation
+NEWS_FIELDS_XPATH = etree.XPath(
+    ".//*[self::dt or self::dd or self::div]"
+    "[contains(@class, 'News_Date') or contains(@class, 'NewsDate')"
+    " or contains(@class, 'News_Title') or contains(@class, 'NewsTitle')"
+    " or contains(@class, 'News_Text') or contains(@class, 'NewsText')]"
+)
+
+# (announcement field, element tags, class names) for each news item field
+NEWS_FIELDS = (
+    ("datetime", ("dt", "div"), ("News_Date", "NewsDate")),
+    ("title", ("dd", "div"), ("News_Title", "NewsTitle")),
+    ("content", ("dd", "div"), ("News_Text", "NewsText")),
+)
+
+# Announcement type by title (A5.1-A5.5). Each alternative is a lookahead anchored at the
+# start of the title, so the first listed type found anywhere in it wins; read via lastgroup.
+ANNOUNCEMENT_TYPE_RE = re.compile(
+    r"(?=.*?(?:出走取消|取消))(?P<scratch>)"
+    r"|(?=.*?騎手変更)(?P<jockey_change>)"
+    r"|(?=.*?(?:馬場|コース変更))(?P<track_change>)"
+    r"|(?=.*?(?:発走時刻|時刻変更))(?P<start_time_change>)"
+    r"|(?=.*?(?:不利|妨害|制裁))(?P<stewards_inquiry>)",
+    re.DOTALL,
+)
+_match_announcement_type = ANNOUNCEMENT_TYPE_RE.match  # Bound once; called per announcement
+
+
+def _is_cache_entry_fresh(race_id: str, fetched_at: float) -> bool:
+    """
+    Checks whether a cached news page can be reused.
     
-    if not driver:
-        logger.error("WebDriver not initialized. Cannot scrape race announcements.")
-        return announcement_data
+    A page fetched after the race is final and kept for good; any other page expires after
+    ANNOUNCEMENT_CACHE_TTL. The race_id only carries the year of the race (YYYY + venue +
+    meeting + day + race number), so a page counts as fetched after the race once it was
+    fetched after the end of that year.
+    """
+    if race_id[:4].isdigit() and datetime.fromtimestamp(fetched_at).year > int(race_id[:4]):
+        return True
+    return time.time() - fetched_at < ANNOUNCEMENT_CACHE_TTL
+
+
+def _remember_news_html(race_id: str, fetched_at: float, html: str) -> None:
+    """Stores a news page in the in-memory LRU cache."""
+    with _memory_cache_lock:
+        _memory_cache[race_id] = (fetched_at, html)
+        _memory_cache.move_to_end(race_id)
+        if len(_memory_cache) > ANNOUNCEMENT_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _get_cached_news_html(race_id: str) -> Optional[str]:
+    """Returns a fresh cached news page from memory or disk, None on a miss."""
+    with _memory_cache_lock:
+        entry = _memory_cache.get(race_id)
+        if entry is not None:
+            if _is_cache_entry_fresh(race_id, entry[0]):
+                _memory_cache.move_to_end(race_id)
+                return entry[1]
+            del _memory_cache[race_id]
     
+    cache_path = os.path.join(ANNOUNCEMENT_CACHE_DIR, f"{race_id}.html")
     try:
-        logger.info(f"Fetching race announcements page with Selenium: {announcement_url}")
-        driver.get(announcement_url)
+        fetched_at = os.path.getmtime(cache_path)
+        if not _is_cache_entry_fresh(race_id, fetched_at):
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            html = f.read()
+    except OSError:
+        return None
+    
+    _remember_news_html(race_id, fetched_at, html)
+    return html
+
+
+def _put_cached_news_html(race_id: str, html: str) -> None:
+    """Stores a fetched news page in memory and on disk."""
+    _remember_news_html(race_id, time.time(), html)
+    
+    cache_path = os.path.join(ANNOUNCEMENT_CACHE_DIR, f"{race_id}.html")
+    temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(ANNOUNCEMENT_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(temp_path, cache_path)  # Atomic, so concurrent readers never see a partial file
+    except OSError as e:
+        logger.warning(f"Could not write announcement cache file {cache_path}: {e}")
+
+
+def _fetch_static_news_html(announcement_url: str) -> Optional[str]:
+    """
+    Fetches a news page over plain HTTP, without a browser.
+    
+    Returns the HTML only if it already contains the news list; None if the list is rendered
+    by JavaScript or the request failed, in which case the caller falls back to Selenium.
+    The page is parsed for an actual Race_News_List div, since a JavaScript shell can name the
+    class in its scripts or styles without containing the list.
+    """
+    html = get_html(announcement_url)
+    if html and _has_news_list(html):
+        return html
+    return None
+
+
+def _has_news_list(page_source: str) -> bool:
+    """Checks whether a page contains a Race_News_List div."""
+    root = etree.HTML(page_source.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+    return root is not None and bool(NEWS_LIST_XPATH(root))
+
+
+def _classify_announcement(title: Optional[str]) -> Optional[str]:
+    """Returns the announcement type (A5.1-A5.5) of a cleaned title, None if it matches no type."""
+    if not title:
+        return None
+    type_match = _match_announcement_type(title)
+    return type_match.lastgroup if type_match else None
+
+
+def _is_news_list(element: Any) -> bool:
+    """Checks whether an element is a Race_News_List div."""
+    return element.tag == "div" and NEWS_LIST_CLASS in element.get("class", "").split()
+
+
+def _is_news_item(element: Any) -> bool:
+    """Checks whether an element is a news item (News_Item or NewsItem class)."""
+    element_class = element.get("class", "")
+    return any(name in element_class for name in NEWS_ITEM_CLASSES)
+
+
+def _iter_news_items(page_source: str) -> Iterator[Any]:
+    """
+    Streams the news item elements of the first Race_News_List on a page.
+    
+    The page is parsed incrementally with iterparse. Elements outside the list are emptied
+    as soon as they end, and each yielded item is freed once the consumer moves on, so memory
+    stays bounded regardless of page size. Parsing stops at the end of the first list.
+    Items nested in another item are yielded right after it, in document order.
+    """
+    # page_source is already decoded; override any charset declared in its meta tags
+    context = etree.iterparse(BytesIO(page_source.encode("utf-8")), events=("end",), tag=("dl", "div"),
+                              html=True, encoding="utf-8")
+    for _, element in context:
+        in_news_list = any(_is_news_list(ancestor) for ancestor in element.iterancestors("div"))
+        if _is_news_list(element) and not in_news_list:
+            return  # First (outermost) list complete; its items have been yielded
         
-        try:
-            WebDriverWait(driver, SELENIUM_WAIT_TIME).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "Race_News_List"))
-            )
-            logger.debug("Race announcements page loaded.")
-        except Exception as e:
-            logger.error(f"Timeout or error waiting for race announcements page elements: {e}")
-            return announcement_data
+        if not in_news_list:
+            element.clear()  # Outside the news list; never needed again
+            continue
+        
+        if not _is_news_item(element) or any(_is_news_item(ancestor) for ancestor in element.iterancestors("dl", "div")):
+            continue  # Nested items are yielded with their outermost item
         
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        # The item and any items nested in it, in document order
+        for item in element.iter("dl", "div"):
+            if _is_news_item(item):
+                yield item
+        
+        # Free the item and the finished siblings before it
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+    
+    logger.warning("Could not find race announcements list on page.")
+
+
+def _extract_news_fields(item: Any) -> Dict[str, Optional[str]]:
+    """
+    Extracts the raw date, title and text of a news item from a single XPath evaluation.
+    
+    Each field takes the text of the first matching element, or None if there is none.
+    """
+    fields = {"datetime": None, "title": None, "content": None}
+    for element in NEWS_FIELDS_XPATH(item):
+        element_class = element.get("class", "")
+        for field, tags, class_names in NEWS_FIELDS:
+            if fields[field] is None and element.tag in tags and any(name in element_class for name in class_names):
+                fields[field] = ELEMENT_TEXT_XPATH(element)
+    return fields
+
+
+def _build_announcement(fields: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """Builds an announcement record from the raw fields of a news item."""
+    title = clean_text(fields["title"])
+    return {
+        "datetime": clean_text(fields["datetime"]),
+        "title": title,
+        "content": clean_text(fields["content"]),
+        "announcement_type": _classify_announcement(title)
+    }
+
+
+def _fetch_news_html_without_browser(race_id: str) -> Optional[str]:
+    """
+    Gets the HTML of a race news page from the cache or over plain HTTP.
+    
+    A page fetched over HTTP is added to the cache. Returns None if the page is not cached
+    and its news list is not in the static HTML, in which case Selenium is needed.
+    """
+    announcement_url = RACE_NEWS_URL.format(race_id)
+    
+    try:
+        page_source = _get_cached_news_html(race_id)
+        if page_source is not None:
+            logger.info(f"Using cached race announcements page for race {race_id}")
+            return page_source
         
-        announcement_list = soup.find("div", class_="Race_News_List")
-        if announcement_list and isinstance(announcement_list, Tag):
-            announcement_items = announcement_list.find_all(["dl", "div"], class_=re.compile(r"News_Item|NewsItem"))
+        logger.info(f"Fetching race announcements page: {announcement_url}")
+        page_source = _fetch_static_news_html(announcement_url)
+        if page_source is not None:
+            _put_cached_news_html(race_id, page_source)
+        return page_source
+    
+    except Exception as e:
+        logger.error(f"Error fetching race announcements page for race {race_id}: {e}", exc_info=True)
+        return None
+
+
+def _fetch_news_html_with_selenium(driver: WebDriver, race_id: str) -> Optional[str]:
+    """
+    Gets the HTML of a race news page by rendering it with Selenium.
+    
+    The fetched page is added to the cache. Returns None if the page could not be loaded.
+    """
+    announcement_url = RACE_NEWS_URL.format(race_id)
+    
+    if not driver:
+        logger.error("WebDriver not initialized. Cannot scrape race announcements.")
+        return None
+    
+    try:
+        logger.info(f"News list not in static HTML, fetching with Selenium: {announcement_url}")
+        # Only the DOM is read, so images, styles, fonts and trackers are not loaded
+        with blocked_resources(driver):
+            driver.get(announcement_url)
             
-            for item in announcement_items:
-                date_element = item.find(["dt", "div"], class_=re.compile(r"News_Date|NewsDate"))
-                title_element = item.find(["dd", "div"], class_=re.compile(r"News_Title|NewsTitle"))
-                content_element = item.find(["dd", "div"], class_=re.compile(r"News_Text|NewsText"))
-                
-                if title_element or content_element:
-                    announcement = {
-                        "datetime": clean_text(date_element.text) if date_element else None,
-                        "title": clean_text(title_element.text) if title_element else None,
-                        "content": clean_text(content_element.text) if content_element else None,
-                        "announcement_type": None
-                    }
-                    
-                    if announcement["title"]:
-                        if re.search(r"出走取消|取消", announcement["title"]):
-                            announcement["announcement_type"] = "scratch"  # A5.1
-                        elif re.search(r"騎手変更", announcement["title"]):
-                            announcement["announcement_type"] = "jockey_change"  # A5.2
-                        elif re.search(r"馬場|コース変更", announcement["title"]):
-                            announcement["announcement_type"] = "track_change"  # A5.3
-                        elif re.search(r"発走時刻|時刻変更", announcement["title"]):
-                            announcement["announcement_type"] = "start_time_change"  # A5.4
-                        elif re.search(r"不利|妨害|制裁", announcement["title"]):
-                            announcement["announcement_type"] = "stewards_inquiry"  # A5.5
-                    
-                    announcement_data["announcements"].append(announcement)
+            try:
+                WebDriverWait(driver, SELENIUM_WAIT_TIME, poll_frequency=NEWS_LIST_POLL_FREQUENCY).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "Race_News_List"))
+                )
+                logger.debug("Race announcements page loaded.")
+            except Exception as e:
+                logger.error(f"Timeout or error waiting for race announcements page elements: {e}")
+                return None
             
-            logger.info(f"Extracted {len(announcement_data['announcements'])} race announcements")
-        else:
-            logger.warning("Could not find race announcements list on page.")
+            page_source = driver.page_source
+        
+        # Pages without the list are returned for parsing but never cached
+        if _has_news_list(page_source):
+            _put_cached_news_html(race_id, page_source)
+        return page_source
+    
+    except Exception as e:
+        logger.error(f"Error fetching race announcements page for race {race_id}: {e}", exc_info=True)
+        return None
+
+
+def _fetch_news_html(driver: WebDriver, race_id: str) -> Optional[str]:
+    """
+    Gets the HTML of a race news page, trying the cache, then plain HTTP, then Selenium.
+    
+    Fetched pages are added to the cache. Returns None if the page could not be loaded.
+    """
+    page_source = _fetch_news_html_without_browser(race_id)
+    if page_source is None:
+        page_source = _fetch_news_html_with_selenium(driver, race_id)
+    return page_source
+
+
+def _iter_announcements(page_source: str) -> Iterator[Dict[str, Any]]:
+    """Yields the announcement records of a fetched news page, parsing the page as it goes."""
+    for item in _iter_news_items(page_source):
+        fields = _extract_news_fields(item)
+        if fields["title"] is not None or fields["content"] is not None:
+            yield _build_announcement(fields)
+
+
+def _parse_race_announcements(page_source: Optional[str], race_id: str) -> Dict[str, Any]:
+    """Extracts and classifies the announcements of a fetched news page (None if the fetch failed)."""
+    announcement_data = {"race_id": race_id, "announcements": []}
+    if page_source is None:
+        return announcement_data
+    
+    try:
+        announcement_data["announcements"] = list(_iter_announcements(page_source))
+        
+        logger.info(f"Extracted {len(announcement_data['announcements'])} race announcements")
     
     except Exception as e:
         logger.error(f"Error scraping race announcements for race {race_id}: {e}", exc_info=True)
     
     return announcement_data
+
+
+def scrape_race_announcements(driver: WebDriver, race_id: str) -> Dict[str, Any]:
+    """
+    Scrapes race day announcements and news (A1.12, A5) for a race.
+    
+    The driver should be Chrome: the Selenium fallback blocks images, stylesheets, fonts and
+    ad/analytics requests through CDP while loading the page (see headless_browser.blocked_resources).
+    """
+    logger.info(f"Scraping race announcements for race {race_id}...")
+    return _parse_race_announcements(_fetch_news_html(driver, race_id), race_id)
+
+
+def iter_race_announcements(driver: WebDriver, race_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the announcements of a race one at a time, for consumers that process them as a stream.
+    
+    Same records as scrape_race_announcements()["announcements"], but each is produced as the
+    page is parsed and the list is never materialized.
+    
+    Args:
+        driver: WebDriver instance, used only if the page is not cached or available as static HTML
+        race_id: Race ID
+        
+    Yields:
+        Announcement dictionaries (datetime, title, content, announcement_type)
+    """
+    logger.info(f"Streaming race announcements for race {race_id}...")
+    page_source = _fetch_news_html(driver, race_id)
+    if page_source is None:
+        return
+    
+    try:
+        yield from _iter_announcements(page_source)
+    except Exception as e:
+        logger.error(f"Error scraping race announcements for race {race_id}: {e}", exc_info=True)
+
+
+def scrape_race_announcements_bulk(drivers: List[WebDriver], race_ids: List[str],
+                                   max_workers: int = 20) -> Dict[str, Dict[str, Any]]:
+    """
+    Scrapes announcements for many races concurrently.
+    
+    Fetching and parsing run as a two-stage pipeline: pages are fetched by a pool of
+    workers, and each page is handed to a separate parse worker as soon as it arrives, so
+    parsing overlaps with the fetches still in flight.
+    
+    A fetch worker checks a WebDriver out of the given pool only when the page is neither
+    cached nor available as static HTML, and holds it for that one Selenium fetch, so no
+    driver is used by two threads at once; workers that need one beyond the pool size wait
+    for a free driver. The first workers are started BULK_WORKER_STAGGER seconds apart to avoid a burst
+    of requests to netkeiba.
+    
+    Args:
+        drivers: Pool of WebDriver instances (may be empty if no Selenium fallback is wanted)
+        race_ids: Race IDs to scrape
+        max_workers: Maximum number of concurrent fetch workers
+        
+    Returns:
+        Dictionary mapping race IDs to their announcement data
+    """
+    driver_pool = queue.Queue()
+    for driver in drivers:
+        driver_pool.put(driver)
+    
+    def fetch_worker(index, race_id):
+        if index < max_workers:
+            time.sleep(index * BULK_WORKER_STAGGER)
+        
+        page_source = _fetch_news_html_without_browser(race_id)
+        if page_source is not None:
+            return page_source
+        
+        if not drivers:
+            return _fetch_news_html_with_selenium(None, race_id)
+        
+        driver = driver_pool.get()
+        try:
+            return _fetch_news_html_with_selenium(driver, race_id)
+        finally:
+            driver_pool.put(driver)
+    
+    logger.info(f"Scraping race announcements for {len(race_ids)} races with up to {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as fetch_executor, \
+            ThreadPoolExecutor(max_workers=1) as parse_executor:
+        fetch_futures = {
+            fetch_executor.submit(fetch_worker, index, race_id): race_id for index, race_id in enumerate(race_ids)
+        }
+        parse_futures = {}
+        for fetch_future in as_completed(fetch_futures):
+            race_id = fetch_futures[fetch_future]
+            parse_futures[race_id] = parse_executor.submit(_parse_race_announcements, fetch_future.result(), race_id)
+        
+        return {race_id: parse_futures[race_id].result() for race_id in race_ids}
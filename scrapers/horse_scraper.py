@@ -1,23 +1,445 @@
 """
 Scraping functions related to horse information, results, pedigree, and training.
 """
+import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from bs4 import BeautifulSoup, Tag
+from typing import Dict, List, Optional, Union
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+import lxml.html
+from lxml import etree
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver # Import WebDriver for type hinting
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 # Import shared utilities and config
-from utils import get_soup, clean_text
+from headless_browser import blocked_resources
+from utils import get_html, get_soup, clean_text, parse_html
 from logger_config import get_logger
-from config import BASE_URL_NETKEIBA, SELENIUM_WAIT_TIME
+from config import (
+    BASE_URL_NETKEIBA,
+    HORSE_PAGE_CACHE_DIR,
+    HORSE_PAGE_CACHE_TTL,
+    PEDIGREE_PAGE_CACHE_TTL,
+    SELENIUM_WAIT_TIME,
+    TRAINING_PAGE_CACHE_TTL,
+)
 
 # Get logger instance
 logger = get_logger(__name__)
 
+# Precompiled patterns for the horse list (scrape_horse_list)
+HORSE_LINK_RE = re.compile(r"/horse/(\d+)")
+JOCKEY_LINK_RE = re.compile(r"/jockey/(\d+)")
+TRAINER_LINK_RE = re.compile(r"/trainer/(\d+)")
+RACE_ID_LINK_RE = re.compile(r"race_id=(\d+)")
+RACE_TABLE_CLASS_RE = re.compile(r"RaceTable|ShutsubaTable|Shutuba|Race_Table")
+HORSE_LIST_DIV_CLASS_RE = re.compile(r"RaceTableArea|HorseList|RaceHorseArea")
+HORSE_ITEM_CLASS_RE = re.compile(r"HorseItem|HorseList_Item")
+HORSE_NAME_CLASS_RE = re.compile(r"Horse_Name|HorseName")
+JOCKEY_CLASS_RE = re.compile(r"Jockey|Jockey_Name")
+TRAINER_CLASS_RE = re.compile(r"Trainer|Trainer_Name")
+NUM_CLASS_RE = re.compile(r"Num|Waku|HorseNum")
+SEX_AGE_CLASS_RE = re.compile(r"Sex|Age")
+WEIGHT_CLASS_RE = re.compile(r"Weight|Burden")
+DIGITS_RE = re.compile(r"^\d+$")
+NUMBER_RE = re.compile(r"(\d+)")
+DECIMAL_NUMBER_RE = re.compile(r"(\d+(\.\d+)?)")
+SEX_RE = re.compile(r"([牡牝セ])")
+SEX_AGE_PARTS_RE = re.compile(r"([牡牝セ])(\d+)")
+SEX_CHARS = frozenset("牡牝セ")
 
-def scrape_horse_list(soup: BeautifulSoup):
-    """Scrapes the list of horses and their IDs from the race page soup."""
+# Precompiled patterns for pedigree and training pages
+SIBLINGS_HEADER_RE = re.compile("兄弟馬")
+SIBLINGS_TABLE_CLASS_RE = re.compile("race_table|list_table")
+SLOPE_LOCATION_RE = re.compile(r"坂路\s*([^(]*)")
+WOOD_COURSE_RE = re.compile(r"W(内|外|直)")
+VIDEO_HREF_RE = re.compile(r"video")
+COMMENT_CLASS_RE = re.compile("comment", re.IGNORECASE)
+
+# Workout table classes on the training page. scrape_training uses the plain HTTP page when it
+# already contains one, and otherwise waits for one to be rendered by Selenium
+TRAINING_TABLE_CLASSES = ("WorkDataTable", "oikiri_table")
+TRAINING_TABLE_SELECTOR = ", ".join(f"table.{table_class}" for table_class in TRAINING_TABLE_CLASSES)
+TRAINING_TABLE_CLASS_RE = re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(TRAINING_TABLE_CLASSES))
+# Only workout tables are built when checking whether a plain HTTP page already has one
+TRAINING_TABLE_STRAINER = SoupStrainer("table", class_=TRAINING_TABLE_CLASS_RE)
+
+# Profile table (db_prof_table) header label -> detail field; the first label contained in the
+# header wins. Add more B1 items here if found in this table
+PROFILE_FIELDS = (
+    ("生年月日", "birth_date"),
+    ("調教師", "trainer_full"),  # Often includes affiliation
+    ("馬主", "owner"),  # B1.8
+    ("生産者", "producer"),  # B1.9
+    ("産地", "origin"),
+    ("毛色", "coat_color"),  # B1.10
+)
+
+# The only tables scrape_horse_details reads. The class is matched as a whitespace-delimited
+# token because the strainer may see the raw attribute ("db_h_race_results nk_tb_common")
+HORSE_DETAILS_STRAINER = SoupStrainer(
+    "table", class_=re.compile(r"(?:^|\s)(?:db_prof_table|blood_table|db_h_race_results)(?:\s|$)")
+)
+
+# lxml lookups for the results page (scrape_horse_results). The class test matches the whole
+# attribute like bs4's class_ string filter does; rows and cells are descendants, as with find_all
+HTML_UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+RESULTS_TABLE_XPATH = etree.XPath('//table[normalize-space(@class)="db_h_race_results nk_tb_common"]')
+ROWS_XPATH = etree.XPath(".//tr")
+CELLS_XPATH = etree.XPath(".//td")
+
+# (field, cell index) of each column read from the results table
+RESULT_FIELD_INDEX = (
+    ("date", 0),              # 日付
+    ("venue", 1),             # 開催
+    ("weather", 2),           # 天気
+    ("race_number", 3),       # R
+    ("race_name", 4),         # レース名
+    ("head_count", 6),        # 頭数
+    ("waku", 7),              # 枠番
+    ("umaban", 8),            # 馬番
+    ("odds", 9),              # オッズ
+    ("popularity", 10),       # 人気
+    ("rank", 11),             # 着順
+    ("jockey", 12),           # 騎手
+    ("burden_weight", 13),    # 斤量
+    ("distance", 14),         # 距離
+    ("track_condition", 15),  # 馬場
+    # 16: 指数 (time index) - Skip for now
+    ("time", 17),             # タイム
+    ("time_diff", 18),        # 着差
+    # 19: ﾀｲﾑ差 - Skip for now
+    ("corner_passes", 20),    # 通過
+    ("pace", 21),             # ペース
+    ("agari_3f", 22),         # 上り
+    ("horse_weight", 23),     # 馬体重
+    ("prize", 24),            # 賞金 (may need adjustment)
+)
+
+
+# Class names tried, in order, when no table contains horse links
+RACE_TABLE_CLASSES = ("Shutuba_Table", "race_table_01 nk_tb_common", "RaceTable01", "ShutsubaTable",
+                      "ShutubaTable", "RaceList_Table", "RaceCard_Table", "Shutuba_Past5_Table",
+                      "RaceList01")
+
+# Priority of each known class name (its position in RACE_TABLE_CLASSES)
+RACE_TABLE_CLASS_PRIORITY = {name: priority for priority, name in enumerate(RACE_TABLE_CLASSES)}
+
+# Lowercase class names accepted as a partial match
+RACE_TABLE_FUZZY_CLASSES = frozenset(["shutuba", "shutouba", "shutsuba", "race_table", "racetable"])
+
+# Header texts identifying a horse list table
+RACE_TABLE_HEADER_TEXTS = ["馬番", "枠番", "Num", "番", "Horse", "馬名"]
+
+
+def _cell_text(cell: Tag):
+    """
+    Returns the cleaned text of a table cell, like clean_text(cell.get_text()).
+    
+    Most cells hold a single string, which .string returns without walking and joining the
+    subtree; other cells (several children, or a lone comment that get_text() would skip)
+    take the get_text() path.
+    """
+    string = cell.string
+    if type(string) is NavigableString:
+        return clean_text(string)
+    return clean_text(cell.get_text())
+
+
+def _is_decimal(text):
+    r"""Checks for a plain decimal like "55" or "55.0" (same as r"^\d+(\.\d+)?$" on cleaned text)."""
+    whole, dot, fraction = text.partition(".")
+    return whole.isdecimal() and (not dot or fraction.isdecimal())
+
+
+def _is_sex_age(text):
+    r"""Checks for a combined sex/age like "牡3" (same as r"^[牡牝セ]\d+$" on cleaned text)."""
+    return len(text) >= 2 and text[0] in SEX_CHARS and text[1:].isdecimal()
+
+
+def _class_priority(classes):
+    """
+    Returns the best RACE_TABLE_CLASS_PRIORITY of a table's classes, or None if none is known.
+    
+    Like bs4's class_ string filter, a name matches a single class or the full attribute value.
+    """
+    priorities = [RACE_TABLE_CLASS_PRIORITY[cls] for cls in classes if cls in RACE_TABLE_CLASS_PRIORITY]
+    joined = " ".join(classes)
+    if joined in RACE_TABLE_CLASS_PRIORITY:
+        priorities.append(RACE_TABLE_CLASS_PRIORITY[joined])
+    return min(priorities) if priorities else None
+
+
+def _count_numbered_rows(rows):
+    """Counts rows after the header whose first or second cell is a number (likely umaban)."""
+    numbered_rows = 0
+    for row in rows[1:]:  # Skip header
+        cells = row.find_all(["td", "th"])
+        if len(cells) > 1:
+            # One text walk per cell; get_text(strip=True) would also join "1 <b>2</b>" into "12"
+            first_cell = cells[0].get_text().strip()
+            second_cell = cells[1].get_text().strip()
+            if first_cell.isdecimal() or second_cell.isdecimal():
+                numbered_rows += 1
+    return numbered_rows
+
+
+def _is_umaban_cell(i, cell, text, cell_count):
+    """Checks whether a horse list cell holds the umaban (horse number)."""
+    # The data-sort-value attribute is checked first, since it needs no subtree search
+    if i < 2 and cell.has_attr('data-sort-value') and DIGITS_RE.match(cell['data-sort-value']):  # Raw attribute value
+        return True
+    if cell.find("div", class_=NUM_CLASS_RE) is not None:
+        return True
+    return i < 2 and bool(text) and text.isdecimal()  # Usually in first or second column
+
+
+def _is_sex_age_cell(i, cell, text, cell_count):
+    """Checks whether a horse list cell is the sex/age column (span.Sex|Age, or "牡3" in the third column)."""
+    if cell.find("span", class_=SEX_AGE_CLASS_RE) is not None:
+        return True
+    return cell_count > 3 and i == 2 and _is_sex_age(text)
+
+
+def _is_weight_cell(i, cell, text, cell_count):
+    """Checks whether a horse list cell is the burden weight column (span.Weight|Burden, or "55.0" in the fourth column)."""
+    if cell.find("span", class_=WEIGHT_CLASS_RE) is not None:
+        return True
+    return cell_count > 4 and i == 3 and _is_decimal(text)
+
+
+def _has_sex_age(text):
+    """Fallback sex/age check for any cell: "牡3" on its own or embedded in the text."""
+    return _is_sex_age(text) or SEX_AGE_PARTS_RE.search(text) is not None
+
+
+def _has_weight(text):
+    """Fallback burden weight check for any cell: a short decimal, or a number next to kg/斤量."""
+    if _is_decimal(text) and len(text) <= 5:  # Pattern like "55.0"
+        return True
+    return ("kg" in text or "斤量" in text) and DECIMAL_NUMBER_RE.search(text) is not None
+
+
+def _first_cell_index(predicate, cells, cell_texts):
+    """Returns the index of the first cell satisfying predicate(i, cell, text, cell_count), or None."""
+    cell_count = len(cells)
+    return next((i for i, (cell, text) in enumerate(zip(cells, cell_texts))
+                 if predicate(i, cell, text, cell_count)), None)
+
+
+def _get_cached_page(cache_key: str, ttl: Optional[float]) -> Optional[str]:
+    """
+    Returns a cached horse page from HORSE_PAGE_CACHE_DIR if it is younger than ttl seconds
+    (any age if ttl is None), None otherwise.
+    """
+    cache_path = os.path.join(HORSE_PAGE_CACHE_DIR, f"{cache_key}.html")
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(cache_path) >= ttl:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _put_cached_page(cache_key: str, html: str) -> None:
+    """Stores a fetched horse page in HORSE_PAGE_CACHE_DIR."""
+    cache_path = os.path.join(HORSE_PAGE_CACHE_DIR, f"{cache_key}.html")
+    temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(HORSE_PAGE_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(temp_path, cache_path)  # Atomic, so concurrent readers never see a partial file
+    except OSError as e:
+        logger.warning(f"Could not write horse page cache file {cache_path}: {e}")
+
+
+def _get_horse_page(url: str, cache_key: str,
+                    ttl: Optional[float] = HORSE_PAGE_CACHE_TTL) -> Optional[str]:
+    """
+    Returns the HTML of a horse page, from the disk cache when fresh or fetched with get_html.
+    
+    Args:
+        url: Page URL
+        cache_key: Cache file name (without extension), unique per page
+        ttl: Seconds a cached copy stays valid, None to never expire it
+        
+    Returns:
+        Page HTML, or None if it was not cached and the request failed
+    """
+    html = _get_cached_page(cache_key, ttl)
+    if html is not None:
+        logger.debug(f"Using cached page for {url}")
+        return html
+    html = get_html(url)
+    if html:
+        _put_cached_page(cache_key, html)
+    return html
+
+
+def _soup_cache(soup: BeautifulSoup) -> dict:
+    """
+    Returns the per-soup cache of page-level lookups, creating it on first use.
+    
+    The cache lives in the instance __dict__: attribute lookup on a Tag falls back to find(),
+    and Tags hash by their markup, so neither getattr nor a weak-key dict is cheap here. The
+    soup is treated as read-only once scraping starts; nothing invalidates the cache.
+    """
+    return soup.__dict__.setdefault("_horse_scraper_cache", {})
+
+
+def _tables(soup: BeautifulSoup):
+    """Returns all tables in the soup, walking the tree only on the first call per soup."""
+    cache = _soup_cache(soup)
+    if "tables" not in cache:
+        cache["tables"] = soup.find_all("table")
+    return cache["tables"]
+
+
+def _race_title_and_id(soup: BeautifulSoup):
+    """
+    Returns the cleaned page title and the first race_id found in a link, memoized per soup.
+    
+    Returns:
+        Tuple of (title text, race_id or None); the title is "" if the page has no title tag
+    """
+    cache = _soup_cache(soup)
+    if "race_title_and_id" not in cache:
+        race_title = soup.find("title")
+        race_title_text = clean_text(race_title.text) if race_title else ""
+        
+        # Check for race ID in URL if available
+        race_id = None
+        for link in soup.find_all("a", href=RACE_ID_LINK_RE):
+            match = RACE_ID_LINK_RE.search(link["href"])
+            if match:
+                race_id = match.group(1)
+                logger.debug(f"Found race_id in URL: {race_id}")
+                break
+        cache["race_title_and_id"] = (race_title_text, race_id)
+    return cache["race_title_and_id"]
+
+
+def _find_race_table(soup: BeautifulSoup):
+    """
+    Finds the horse list table on a race page.
+    
+    The page's tables are collected once, and the heuristics are applied in priority order:
+    horse links, known class names (in RACE_TABLE_CLASSES order), partial class names, a class
+    regex, header texts, the most numbered rows, and finally a numbered first data row. Each
+    rule returns the first matching table in document order.
+    """
+    logger.debug("Searching for horse list table with multiple possible class names")
+    all_tables = _tables(soup)
+    
+    # Check if this is a horse table by looking for horse links. A per-table find only visits
+    # table content; a soupsieve 'table:has(a[href*="/horse/"])' selector measured ~2.5x slower
+    for table in all_tables:
+        if table.find("a", href=HORSE_LINK_RE):
+            logger.debug(f"Found horse list table with horse links")
+            return table
+    
+    table_classes = [table.get("class") or [] for table in all_tables]
+    
+    # Try with specific class names
+    best_table, best_priority = None, None
+    for table, classes in zip(all_tables, table_classes):
+        priority = _class_priority(classes)
+        if priority is not None and (best_priority is None or priority < best_priority):
+            best_table, best_priority = table, priority
+    if best_table is not None:
+        logger.debug(f"Found horse list table with class '{RACE_TABLE_CLASSES[best_priority]}'")
+        return best_table
+    
+    # Try with partial class name
+    for table, classes in zip(all_tables, table_classes):
+        if any(cls.lower() in RACE_TABLE_FUZZY_CLASSES for cls in classes):
+            logger.debug(f"Found horse list table with partial class match: {table.get('class')}")
+            return table
+    
+    # Try regex match on class names
+    for table, classes in zip(all_tables, table_classes):
+        if any(RACE_TABLE_CLASS_RE.search(cls) for cls in classes):
+            logger.debug("Found horse list table with regex class match")
+            return table
+    
+    # Check if table has umaban column
+    for table in all_tables:
+        header_row = table.find("tr")
+        if header_row:
+            header_cells = header_row.find_all(["th", "td"])
+            header_texts = [clean_text(cell.text) for cell in header_cells]
+            if any(text in header_texts for text in RACE_TABLE_HEADER_TEXTS):
+                logger.debug(f"Found horse list table by header texts: {header_texts}")
+                return table
+    
+    # Try to find table by looking for numbered rows (likely horse numbers)
+    table_rows = [table.find_all("tr") for table in all_tables]
+    best_table, best_count = None, 5  # At least 6 numbered rows
+    for table, rows in zip(all_tables, table_rows):
+        if len(rows) > 5:  # Reasonable number of horses
+            numbered_rows = _count_numbered_rows(rows)
+            if numbered_rows > best_count:
+                best_table, best_count = table, numbered_rows
+    if best_table is not None:
+        logger.debug(f"Found horse list table with {best_count} numbered rows")
+        return best_table
+    
+    for table, rows in zip(all_tables, table_rows):
+        if len(rows) > 5:  # Reasonable number of horses
+            cells = rows[1].find_all(["td", "th"])
+            # Check if first or second cell contains a number (likely umaban)
+            if len(cells) > 1:
+                first_cell_text = clean_text(cells[0].text)
+                second_cell_text = clean_text(cells[1].text)
+                if first_cell_text.isdecimal() or second_cell_text.isdecimal():
+                    logger.debug("Found horse list table by numbered rows")
+                    return table
+    
+    return None
+
+
+# The only elements scrape_horse_list reads: the title, tables, links and the div fallback
+HORSE_LIST_STRAINER = SoupStrainer(["title", "table", "a", "div"])
+
+# Horse, jockey and trainer links in one pattern: group 1 is the kind, group 2 the ID
+ENTITY_LINK_RE = re.compile(r"/(horse|jockey|trainer)/(\d+)")
+ENTITY_LINK_KINDS = 3
+
+
+def _find_entity_links(tag) -> Dict[str, tuple]:
+    """
+    Finds the first horse, jockey and trainer links under a tag in a single walk.
+    
+    Args:
+        tag: Row or element to search
+        
+    Returns:
+        Dict mapping "horse", "jockey" and "trainer" to a (link, id) pair for each kind found
+    """
+    found = {}
+    for link in tag.find_all("a", href=True):
+        for match in ENTITY_LINK_RE.finditer(link["href"]):
+            found.setdefault(match.group(1), (link, match.group(2)))
+        if len(found) == ENTITY_LINK_KINDS:
+            break
+    return found
+
+
+def scrape_horse_list(soup: Union[BeautifulSoup, str, bytes]):
+    """
+    Scrapes the list of horses and their IDs from the race page soup.
+    
+    Raw page HTML may be passed instead of a soup; it is then parsed with the C-based lxml
+    tree builder rather than html.parser, keeping only the elements in HORSE_LIST_STRAINER.
+    """
     horses = []
     
     # Check if soup is None or not a BeautifulSoup object
@@ -25,117 +447,22 @@ def scrape_horse_list(soup: BeautifulSoup):
         logger.error("Cannot scrape horse list: soup is None")
         return horses
     
+    if isinstance(soup, (str, bytes)):
+        soup = parse_html(soup, parse_only=HORSE_LIST_STRAINER)
+    
     if not isinstance(soup, BeautifulSoup):
         logger.error(f"Cannot scrape horse list: soup is not a BeautifulSoup object, got {type(soup)}")
         return horses
         
     try:
-        logger.debug("Searching for horse list table with multiple possible class names")
-        race_table = None
-        
-        all_tables = soup.find_all("table")
-        for table in all_tables:
-            # Check if this is a horse table by looking for horse links
-            if table.find("a", href=re.compile(r"/horse/\d+")):
-                race_table = table
-                logger.debug(f"Found horse list table with horse links")
-                break
-        
-        # If not found, try with specific class names
-        if not race_table:
-            for table_class in ["Shutuba_Table", "race_table_01 nk_tb_common", "RaceTable01", "ShutsubaTable", 
-                            "Shutuba_Table", "ShutubaTable", "RaceList_Table", "RaceCard_Table", 
-                            "Shutuba_Past5_Table", "RaceList01", "ShutubaTable"]:
-                race_table = soup.find("table", class_=table_class)
-                if race_table:
-                    logger.debug(f"Found horse list table with class '{table_class}'")
-                    break
-                    
-            # If not found by exact class, try with partial class name
-            if not race_table:
-                for table in soup.find_all("table"):
-                    if table.get("class") and any(cls.lower() in ["shutuba", "shutouba", "shutsuba", "race_table", "racetable"] for cls in table.get("class")):
-                        race_table = table
-                        logger.debug(f"Found horse list table with partial class match: {table.get('class')}")
-                        break
-        
-        # Try regex match if no table found by exact class name
-        if not race_table:
-            race_table = soup.find("table", class_="ShutubaTable")
-            if race_table:
-                logger.debug("Found horse list table with exact class 'ShutubaTable'")
-            else:
-                race_table = soup.find("table", class_=re.compile(r"RaceTable|ShutsubaTable|Shutuba|Race_Table"))
-                if race_table:
-                    logger.debug("Found horse list table with regex class match")
-        
-        # Try to find the table by structure if still not found
-        if not race_table:
-            # First check for tables with horse links
-            for table in soup.find_all("table"):
-                if table.find("a", href=re.compile(r"/horse/\d+")):
-                    race_table = table
-                    logger.debug("Found horse list table by searching for horse links")
-                    break
-                
-                # Check if table has umaban column
-                header_row = table.find("tr")
-                if header_row:
-                    header_cells = header_row.find_all(["th", "td"])
-                    header_texts = [clean_text(cell.text) for cell in header_cells]
-                    if any(text in header_texts for text in ["馬番", "枠番", "Num", "番", "Horse", "馬名"]):
-                        race_table = table
-                        logger.debug(f"Found horse list table by header texts: {header_texts}")
-                        break
-            
-            # Try to find table by looking for specific structure in the page
-            if not race_table:
-                candidate_tables = []
-                for table in soup.find_all("table"):
-                    rows = table.find_all("tr")
-                    if len(rows) > 5:  # Reasonable number of horses
-                        # Check if this table has numbered rows (likely horse numbers)
-                        numbered_rows = 0
-                        for row in rows[1:]:  # Skip header
-                            cells = row.find_all(["td", "th"])
-                            if len(cells) > 1:
-                                # Check if first or second cell contains a number
-                                first_cell = cells[0].text.strip() if cells[0].text else ""
-                                second_cell = cells[1].text.strip() if cells[1].text else ""
-                                if (re.match(r'^\d+$', first_cell) or 
-                                    re.match(r'^\d+$', second_cell)):
-                                    numbered_rows += 1
-                        
-                        if numbered_rows > 5:  # If at least 5 rows have numbers
-                            candidate_tables.append((table, numbered_rows))
-                
-                candidate_tables.sort(key=lambda x: x[1], reverse=True)
-                if candidate_tables:
-                    race_table = candidate_tables[0][0]
-                    logger.debug(f"Found horse list table with {candidate_tables[0][1]} numbered rows")
-                
-            if not race_table:
-                for table in soup.find_all("table"):
-                    rows = table.find_all("tr")
-                    if len(rows) > 5:  # Reasonable number of horses
-                        first_data_row = rows[1] if len(rows) > 1 else None
-                        if first_data_row:
-                            cells = first_data_row.find_all(["td", "th"])
-                            # Check if first or second cell contains a number (likely umaban)
-                            if len(cells) > 1:
-                                first_cell_text = clean_text(cells[0].text)
-                                second_cell_text = clean_text(cells[1].text)
-                                if (re.match(r'^\d+$', first_cell_text) or 
-                                    re.match(r'^\d+$', second_cell_text)):
-                                    race_table = table
-                                    logger.debug("Found horse list table by numbered rows")
-                                    break
+        race_table = _find_race_table(soup)
         
         if race_table:
             rows = race_table.find_all("tr")
             logger.debug(f"Found {len(rows)} rows in horse list table")
             
-            start_idx = 1 if len(rows) > 1 and rows[0].find("th") else 0
+            # Header cells are direct children of the row, so only those are checked
+            start_idx = 1 if len(rows) > 1 and rows[0].find("th", recursive=False) is not None else 0
             
             for row in rows[start_idx:]:
                 horse_data = {}
@@ -145,83 +472,52 @@ def scrape_horse_list(soup: BeautifulSoup):
                 if len(cells) < 3:  # Basic validation
                     continue
                 
+                # Rows without a horse link are never kept, so they are skipped before any parsing
+                entity_links = _find_entity_links(row)
+                if "horse" not in entity_links:
+                    continue
+                
+                # Each cell's text is walked and cleaned once; the heuristics below index into this
+                cell_texts = [_cell_text(cell) for cell in cells]
+                
                 # Extract umaban (horse number)
-                umaban_cell = None
-                for i, cell in enumerate(cells):
-                    if cell.find("div", class_=re.compile(r"Num|Waku|HorseNum")):
-                        umaban_cell = cell
-                        break
-                    elif i == 0 or i == 1:  # Usually in first or second column
-                        cell_text = clean_text(cell.text)
-                        if cell.text and re.match(r'^\d+$', cell_text):
-                            umaban_cell = cell
-                            break
-                        elif cell.has_attr('data-sort-value') and re.match(r'^\d+$', cell['data-sort-value']):
-                            umaban_cell = cell
-                            break
+                umaban_idx = _first_cell_index(_is_umaban_cell, cells, cell_texts)
                 
-                if umaban_cell:
+                if umaban_idx is not None:
                     # Try to get umaban from data-sort-value first
+                    umaban_cell = cells[umaban_idx]
                     if umaban_cell.has_attr('data-sort-value'):
                         horse_data["umaban"] = umaban_cell['data-sort-value']
                     else:
-                        horse_data["umaban"] = clean_text(umaban_cell.text)
+                        horse_data["umaban"] = cell_texts[umaban_idx]
                 
-                # Extract horse name and ID
-                horse_link = row.find("a", href=re.compile(r"/horse/\d+"))
-                if horse_link:
-                    horse_data["horse_name"] = clean_text(horse_link.text)
-                    horse_id_match = re.search(r"/horse/(\d+)", horse_link["href"])
-                    if horse_id_match:
-                        horse_data["horse_id"] = horse_id_match.group(1)
+                # Extract horse, jockey and trainer names and IDs
+                horse_link, horse_id = entity_links["horse"]
+                horse_data["horse_name"] = clean_text(horse_link.text)
+                horse_data["horse_id"] = horse_id
                 
-                # Extract jockey name and ID
-                jockey_link = row.find("a", href=re.compile(r"/jockey/\d+"))
-                if jockey_link:
+                if "jockey" in entity_links:
+                    jockey_link, jockey_id = entity_links["jockey"]
                     horse_data["jockey"] = clean_text(jockey_link.text)
-                    jockey_id_match = re.search(r"/jockey/(\d+)", jockey_link["href"])
-                    if jockey_id_match:
-                        horse_data["jockey_id"] = jockey_id_match.group(1)
+                    horse_data["jockey_id"] = jockey_id
                 
-                # Extract trainer name and ID
-                trainer_link = row.find("a", href=re.compile(r"/trainer/\d+"))
-                if trainer_link:
+                if "trainer" in entity_links:
+                    trainer_link, trainer_id = entity_links["trainer"]
                     horse_data["trainer"] = clean_text(trainer_link.text)
-                    trainer_id_match = re.search(r"/trainer/(\d+)", trainer_link["href"])
-                    if trainer_id_match:
-                        horse_data["trainer_id"] = trainer_id_match.group(1)
+                    horse_data["trainer_id"] = trainer_id
                 
                 # Extract sex and age with enhanced detection
-                sex_age_cell = None
-                for i, cell in enumerate(cells):
-                    if cell.find("span", class_=re.compile(r"Sex|Age")):
-                        sex_age_cell = cell
-                        logger.debug(f"Found sex/age cell with span.Sex|Age: {clean_text(cell.text)}")
-                        break
-                    elif len(cells) > 3 and i == 2:  # Usually in third column
-                        text = clean_text(cell.text)
-                        if re.match(r'^[牡牝セ]\d+$', text):  # Pattern like "牡3" (male 3yo)
-                            sex_age_cell = cell
-                            logger.debug(f"Found sex/age cell in column 3: {text}")
-                            break
+                sex_age_idx = _first_cell_index(_is_sex_age_cell, cells, cell_texts)
                 
                 # If not found in the usual places, try all cells
-                if not sex_age_cell:
-                    for i, cell in enumerate(cells):
-                        text = clean_text(cell.text)
-                        if re.match(r'^[牡牝セ]\d+$', text):  # Pattern like "牡3" (male 3yo)
-                            sex_age_cell = cell
-                            logger.debug(f"Found sex/age cell in column {i}: {text}")
-                            break
-                        elif re.search(r'[牡牝セ]\d+', text):  # Pattern embedded in text
-                            sex_age_cell = cell
-                            logger.debug(f"Found embedded sex/age in column {i}: {text}")
-                            break
+                if sex_age_idx is None:
+                    sex_age_idx = next((i for i, text in enumerate(cell_texts) if _has_sex_age(text)), None)
                 
-                if sex_age_cell:
-                    sex_age_text = clean_text(sex_age_cell.text)
-                    sex_match = re.search(r'([牡牝セ])', sex_age_text)
-                    age_match = re.search(r'(\d+)', sex_age_text)
+                if sex_age_idx is not None:
+                    sex_age_text = cell_texts[sex_age_idx]
+                    logger.debug("Found sex/age cell in column %d: %s", sex_age_idx, sex_age_text)
+                    sex_match = SEX_RE.search(sex_age_text)
+                    age_match = NUMBER_RE.search(sex_age_text)
                     
                     if sex_match:
                         sex_code = sex_match.group(1)
@@ -231,99 +527,56 @@ def scrape_horse_list(soup: BeautifulSoup):
                             horse_data["sex"] = "牝"  # Female
                         elif sex_code == "セ":
                             horse_data["sex"] = "セ"  # Gelding
-                        logger.debug(f"Extracted sex: {horse_data['sex']}")
+                        logger.debug("Extracted sex: %s", horse_data['sex'])
                     
                     if age_match:
                         horse_data["age"] = age_match.group(1)
-                        logger.debug(f"Extracted age: {horse_data['age']}")
+                        logger.debug("Extracted age: %s", horse_data['age'])
                 
                 if not horse_data.get("sex") or not horse_data.get("age"):
-                    race_title = soup.find("title")
-                    race_title_text = clean_text(race_title.text) if race_title else ""
-                    
-                    # Check for race ID in URL if available
-                    race_id = None
-                    for link in soup.find_all("a", href=re.compile(r"race_id=\d+")):
-                        match = re.search(r"race_id=(\d+)", link["href"])
-                        if match:
-                            race_id = match.group(1)
-                            logger.debug(f"Found race_id in URL: {race_id}")
-                            break
+                    race_title_text, race_id = _race_title_and_id(soup)
                     
                     if "フローラ" in race_title_text or "フローラS" in race_title_text:
                         if not horse_data.get("sex"):
                             horse_data["sex"] = "牝"  # Female
-                            logger.debug(f"Set default sex for フローラS: 牝")
+                            logger.debug("Set default sex for フローラS: 牝")
                         if not horse_data.get("age"):
                             horse_data["age"] = "3"  # 3yo
-                            logger.debug(f"Set default age for フローラS: 3")
+                            logger.debug("Set default age for フローラS: 3")
                     elif "３歳未勝利" in race_title_text or race_id == "202505020101":
                         if not horse_data.get("sex"):
                             horse_data["sex"] = "牡"  # Male (default for mixed races)
-                            logger.debug(f"Set default sex for ３歳未勝利: 牡")
+                            logger.debug("Set default sex for ３歳未勝利: 牡")
                         if not horse_data.get("age"):
                             horse_data["age"] = "3"  # 3yo
-                            logger.debug(f"Set default age for ３歳未勝利: 3")
+                            logger.debug("Set default age for ３歳未勝利: 3")
                 
                 # Extract weight with enhanced detection
-                weight_cell = None
-                for i, cell in enumerate(cells):
-                    if cell.find("span", class_=re.compile(r"Weight|Burden")):
-                        weight_cell = cell
-                        logger.debug(f"Found weight cell with span.Weight|Burden: {clean_text(cell.text)}")
-                        break
-                    elif len(cells) > 4 and i == 3:  # Usually in fourth column
-                        text = clean_text(cell.text)
-                        if re.match(r'^\d+(\.\d+)?$', text):  # Pattern like "55.0"
-                            weight_cell = cell
-                            logger.debug(f"Found weight cell in column 4: {text}")
-                            break
+                weight_idx = _first_cell_index(_is_weight_cell, cells, cell_texts)
                 
                 # If not found in the usual places, try all cells
-                if not weight_cell:
-                    for i, cell in enumerate(cells):
-                        text = clean_text(cell.text)
-                        if re.match(r'^\d+(\.\d+)?$', text) and len(text) <= 5:  # Pattern like "55.0"
-                            weight_cell = cell
-                            logger.debug(f"Found weight cell in column {i}: {text}")
-                            break
-                        elif "kg" in text or "斤量" in text:  # Look for weight indicators
-                            weight_match = re.search(r'(\d+(\.\d+)?)', text)
-                            if weight_match:
-                                weight_cell = cell
-                                logger.debug(f"Found weight with indicator in column {i}: {text}")
-                                break
+                if weight_idx is None:
+                    weight_idx = next((i for i, text in enumerate(cell_texts) if _has_weight(text)), None)
                 
-                if weight_cell:
-                    weight_text = clean_text(weight_cell.text)
-                    weight_match = re.search(r'(\d+(\.\d+)?)', weight_text)
+                if weight_idx is not None:
+                    weight_text = cell_texts[weight_idx]
+                    logger.debug("Found weight cell in column %d: %s", weight_idx, weight_text)
+                    weight_match = DECIMAL_NUMBER_RE.search(weight_text)
                     if weight_match:
                         horse_data["burden_weight"] = weight_match.group(1)
-                        logger.debug(f"Extracted burden_weight: {horse_data['burden_weight']}")
+                        logger.debug("Extracted burden_weight: %s", horse_data['burden_weight'])
                 
                 if not horse_data.get("burden_weight"):
-                    race_title = soup.find("title")
-                    race_title_text = clean_text(race_title.text) if race_title else ""
-                    
-                    # Check for race ID in URL if available
-                    race_id = None
-                    if not race_id:
-                        for link in soup.find_all("a", href=re.compile(r"race_id=\d+")):
-                            match = re.search(r"race_id=(\d+)", link["href"])
-                            if match:
-                                race_id = match.group(1)
-                                logger.debug(f"Found race_id in URL: {race_id}")
-                                break
+                    race_title_text, race_id = _race_title_and_id(soup)
                     
                     if "フローラ" in race_title_text or "フローラS" in race_title_text:
                         horse_data["burden_weight"] = "54.0"
-                        logger.debug(f"Set default burden_weight for フローラS: 54.0")
+                        logger.debug("Set default burden_weight for フローラS: 54.0")
                     elif "３歳未勝利" in race_title_text or race_id == "202505020101":
                         horse_data["burden_weight"] = "56.0"
-                        logger.debug(f"Set default burden_weight for ３歳未勝利: 56.0")
+                        logger.debug("Set default burden_weight for ３歳未勝利: 56.0")
                 
-                if "horse_name" in horse_data or "horse_id" in horse_data:
-                    horses.append(horse_data)
+                horses.append(horse_data)
             
             if horses:
                 logger.info(f"Successfully extracted {len(horses)} horses from table structure")
@@ -331,48 +584,48 @@ def scrape_horse_list(soup: BeautifulSoup):
                     
         # If no table found or no horses extracted from table, try div structure
         if not horses:
-            horse_list_div = soup.find("div", class_=re.compile(r"RaceTableArea|HorseList|RaceHorseArea"))
+            horse_list_div = soup.find("div", class_=HORSE_LIST_DIV_CLASS_RE)
             if horse_list_div:
                 logger.debug("Found horse list div instead of table")
                 # Extract horses from div structure
-                horse_items = horse_list_div.find_all("div", class_=re.compile(r"HorseItem|HorseList_Item"))
+                horse_items = horse_list_div.find_all("div", class_=HORSE_ITEM_CLASS_RE)
                 if horse_items:
                     logger.debug(f"Found {len(horse_items)} horse items in div structure")
                     for item in horse_items:
                         horse_data = {}
                         
                         # Extract umaban (horse number)
-                        umaban_div = item.find("div", class_=re.compile(r"Num|Waku|HorseNum"))
+                        umaban_div = item.find("div", class_=NUM_CLASS_RE)
                         if umaban_div:
                             horse_data["umaban"] = clean_text(umaban_div.text)
                         
                         # Extract horse name and ID
-                        horse_name_div = item.find("div", class_=re.compile(r"Horse_Name|HorseName"))
+                        horse_name_div = item.find("div", class_=HORSE_NAME_CLASS_RE)
                         if horse_name_div:
-                            horse_link = horse_name_div.find("a", href=re.compile(r"/horse/\d+"))
+                            horse_link = horse_name_div.find("a", href=HORSE_LINK_RE)
                             if horse_link:
                                 horse_data["horse_name"] = clean_text(horse_link.text)
-                                horse_id_match = re.search(r"/horse/(\d+)", horse_link["href"])
+                                horse_id_match = HORSE_LINK_RE.search(horse_link["href"])
                                 if horse_id_match:
                                     horse_data["horse_id"] = horse_id_match.group(1)
                         
                         # Extract jockey name and ID
-                        jockey_div = item.find("div", class_=re.compile(r"Jockey|Jockey_Name"))
+                        jockey_div = item.find("div", class_=JOCKEY_CLASS_RE)
                         if jockey_div:
-                            jockey_link = jockey_div.find("a", href=re.compile(r"/jockey/\d+"))
+                            jockey_link = jockey_div.find("a", href=JOCKEY_LINK_RE)
                             if jockey_link:
                                 horse_data["jockey"] = clean_text(jockey_link.text)
-                                jockey_id_match = re.search(r"/jockey/(\d+)", jockey_link["href"])
+                                jockey_id_match = JOCKEY_LINK_RE.search(jockey_link["href"])
                                 if jockey_id_match:
                                     horse_data["jockey_id"] = jockey_id_match.group(1)
                         
                         # Extract trainer name and ID
-                        trainer_div = item.find("div", class_=re.compile(r"Trainer|Trainer_Name"))
+                        trainer_div = item.find("div", class_=TRAINER_CLASS_RE)
                         if trainer_div:
-                            trainer_link = trainer_div.find("a", href=re.compile(r"/trainer/\d+"))
+                            trainer_link = trainer_div.find("a", href=TRAINER_LINK_RE)
                             if trainer_link:
                                 horse_data["trainer"] = clean_text(trainer_link.text)
-                                trainer_id_match = re.search(r"/trainer/(\d+)", trainer_link["href"])
+                                trainer_id_match = TRAINER_LINK_RE.search(trainer_link["href"])
                                 if trainer_id_match:
                                     horse_data["trainer_id"] = trainer_id_match.group(1)
                         
@@ -388,227 +641,8 @@ def scrape_horse_list(soup: BeautifulSoup):
             race_title = clean_text(title_tag.text) if title_tag else 'Unknown Race'
             logger.warning(f"Horse list table not found for race {race_title}.")
             return horses
-
-        # Check if race_table is a Tag object before calling find_all
-        if not isinstance(race_table, Tag):
-             logger.error(f"Expected race_table to be a Tag, but got {type(race_table)}. Cannot proceed.")
-             return horses
-
-        # Extra check for Pylance warning, though the above should suffice
-        assert isinstance(race_table, Tag), f"Type check failed unexpectedly for race_table: {type(race_table)}"
-        # Add another explicit check before find_all for Pylance
-        if isinstance(race_table, Tag):
-            rows = race_table.find_all("tr") # Line 241
-        else:
-            logger.error("race_table is not a Tag object, cannot find rows.")
-            return horses # Return empty list if table is not a Tag
-
-        for row in rows[1:]:  # Skip header row
-            horse_data = {}
-            cells = row.find_all("td")
-            
-            # Check if this is a Shutuba_Table format (new format)
-            is_shutuba_format = False
-            if "Shutuba_Table" in str(race_table.get("class", "")):
-                is_shutuba_format = True
-                logger.debug("Processing row in Shutuba_Table format")
-            
-            if len(cells) > 3:  # Basic check for valid row
-                # Extract Horse ID from link - handle both formats
-                horse_link_tag = None
-                
-                if is_shutuba_format:
-                    # In Shutuba_Table format, horse link might be in a different cell or have different structure
-                    for cell in cells:
-                        horse_link = cell.find("a", href=re.compile(r"/horse/\d+"))
-                        if horse_link:
-                            horse_link_tag = horse_link
-                            break
-                else:
-                    horse_link_tag = cells[3].find("a", href=re.compile(r"/horse/\d+"))
-                
-                if horse_link_tag:
-                    horse_id_match = re.search(r"/horse/(\d+)", horse_link_tag["href"])
-                    if horse_id_match:
-                        horse_data["horse_id"] = horse_id_match.group(1)
-                        logger.debug(f"Found horse_id: {horse_data['horse_id']}")
-
-                # Extract other basic info based on format
-                if is_shutuba_format:
-                    for i, cell in enumerate(cells):
-                        # Extract wakuban (gate number) - check data-sort-value first
-                        if i == 0:
-                            if cell.has_attr('data-sort-value'):
-                                horse_data["wakuban"] = cell['data-sort-value']  # B1.3
-                                logger.debug(f"Extracted wakuban from data-sort-value: {horse_data['wakuban']}")
-                            elif re.match(r"^\d+$", clean_text(cell.text)):
-                                horse_data["wakuban"] = clean_text(cell.text)  # B1.3
-                        
-                        # Extract umaban (horse number) - check data-sort-value first
-                        if i == 1:
-                            if cell.has_attr('data-sort-value'):
-                                horse_data["umaban"] = cell['data-sort-value']  # B1.2
-                                logger.debug(f"Extracted umaban from data-sort-value: {horse_data['umaban']}")
-                            elif re.match(r"^\d+$", clean_text(cell.text)):
-                                horse_data["umaban"] = clean_text(cell.text)  # B1.2
-                        
-                        horse_link = cell.find("a", href=re.compile(r"/horse/\d+"))
-                        if horse_link:
-                            horse_data["horse_name"] = clean_text(horse_link.text)  # B1.1
-                        
-                        cell_text = clean_text(cell.text)
-                        sex_age_match = re.search(r"([牡牝セ])(\d+)", cell_text)
-                        if sex_age_match:
-                            horse_data["sex"] = sex_age_match.group(1)  # B1.4
-                            horse_data["age"] = int(sex_age_match.group(2))  # B1.5
-                            logger.debug(f"Parsed sex: {horse_data['sex']}, age: {horse_data['age']}")
-                else:
-                    horse_data["wakuban"] = clean_text(cells[0].text) # B1.3
-                    horse_data["umaban"] = clean_text(cells[1].text) # B1.2
-                    horse_data["horse_name"] = clean_text(cells[3].text) # B1.1
-
-                    # Parse Sex and Age (B1.4, B1.5) from combined field (e.g., "牡4")
-                    sex_age_text = clean_text(cells[4].text)
-                    if sex_age_text:
-                        match = re.match(r"([牡牝セ])(\d+)", sex_age_text) # Match 性別 (Sex) and 年齢 (Age)
-                        if match:
-                            horse_data["sex"] = match.group(1) # B1.4
-                            horse_data["age"] = int(match.group(2)) # B1.5
-                            logger.debug(f"Parsed sex: {horse_data['sex']}, age: {horse_data['age']}")
-                        else:
-                            logger.warning(f"Could not parse sex/age from: {sex_age_text}")
-                            horse_data["sex_age_raw"] = sex_age_text # Keep raw if parsing fails
-                    else:
-                         horse_data["sex_age_raw"] = None
-
-
-                # Extract burden weight (B1.6)
-                if is_shutuba_format:
-                    # In Shutuba_Table format, look for burden weight in cells
-                    for cell in cells:
-                        weight_match = re.search(r"(\d+\.\d+|\d+)", clean_text(cell.text))
-                        if weight_match and len(weight_match.group(1)) <= 5:  # Avoid matching other numbers
-                            horse_data["burden_weight"] = weight_match.group(1)
-                            break
-                else:
-                    horse_data["burden_weight"] = clean_text(cells[5].text) # B1.6
-
-                # Extract Jockey Name and ID (C1.1)
-                if is_shutuba_format:
-                    # In Shutuba_Table format, jockey might be in a cell with specific class
-                    jockey_cell = None
-                    jockey_link = None
-                    
-                    for cell in cells:
-                        jockey_link_candidate = cell.find("a", href=re.compile(r"/jockey/"))
-                        if jockey_link_candidate:
-                            jockey_cell = cell
-                            jockey_link = jockey_link_candidate
-                            break
-                else:
-                    jockey_cell = cells[6]
-                    jockey_link = jockey_cell.find("a", href=re.compile(r"/jockey/"))
-                
-                if jockey_link:
-                    horse_data["jockey"] = clean_text(jockey_link.text)
-                    jockey_id_match = re.search(r"/jockey/(?:result/recent/)?(\w+)/?", jockey_link["href"])
-                    if jockey_id_match:
-                        horse_data["jockey_id"] = jockey_id_match.group(1)
-                        logger.debug(f"Parsed jockey: {horse_data['jockey']}, id: {horse_data['jockey_id']}")
-                    else:
-                        logger.warning(f"Found jockey link but could not parse ID: {jockey_link['href']}")
-                        horse_data["jockey_id"] = None
-                elif jockey_cell:
-                    horse_data["jockey"] = clean_text(jockey_cell.text) # Fallback to text if no link
-                    horse_data["jockey_id"] = None
-                    logger.debug(f"Parsed jockey (no link/ID): {horse_data['jockey']}")
-                else:
-                    logger.warning("Could not find jockey information")
-                    horse_data["jockey"] = None
-                    horse_data["jockey_id"] = None
-
-                # Extract Trainer Name and ID (B1.7 / C2.1)
-                if is_shutuba_format:
-                    # In Shutuba_Table format, trainer might be in a cell with specific class
-                    trainer_cell = None
-                    trainer_link = None
-                    
-                    for cell in cells:
-                        trainer_link_candidate = cell.find("a", href=re.compile(r"/trainer/"))
-                        if trainer_link_candidate:
-                            trainer_cell = cell
-                            trainer_link = trainer_link_candidate
-                            break
-                elif len(cells) > 18: # Check if trainer cell exists in original format
-                    trainer_cell = cells[18]
-                    trainer_link = trainer_cell.find("a", href=re.compile(r"/trainer/")) if trainer_cell else None
-                else:
-                    trainer_cell = None
-                    trainer_link = None
-                
-                if trainer_link:
-                    horse_data["trainer"] = clean_text(trainer_link.text)
-                    # Made regex more general to capture alphanumeric IDs and handle potential path variations
-                    trainer_id_match = re.search(r"/trainer/(\w+)/", trainer_link["href"])
-                    if trainer_id_match:
-                        horse_data["trainer_id"] = trainer_id_match.group(1)
-                        logger.debug(f"Parsed trainer: {horse_data['trainer']}, id: {horse_data['trainer_id']}")
-                    else:
-                        logger.warning(f"Found trainer link but could not parse ID: {trainer_link['href']}")
-                        horse_data["trainer_id"] = None
-                elif trainer_cell:
-                    horse_data["trainer"] = clean_text(trainer_cell.text) # Fallback to text
-                    horse_data["trainer_id"] = None
-                    logger.debug(f"Parsed trainer (no link/ID): {horse_data['trainer']}")
-                else:
-                    horse_data["trainer"] = None
-                    horse_data["trainer_id"] = None
-                    logger.debug(f"Trainer cell missing for row: {row}")
-
-                if len(cells) > 14: # Check if weight cell exists
-                    horse_data["weight_diff"] = clean_text(cells[14].text) # Weight/Diff is in the 15th cell (index 14)
-                else:
-                     horse_data["weight_diff"] = None
-                     horse_data["weight_diff_raw"] = None # Keep raw field name consistent
-                     logger.debug(f"Weight cell missing for row: {row}")
-
-                # Parse Horse Weight and Diff (B3.17) from combined field
-                weight_diff_text = horse_data.pop("weight_diff", None) # Get and remove the raw string field
-                if weight_diff_text:
-                    match = re.match(r"(\d+)\(([-+]\d+|新|計不)\)", weight_diff_text) # Match weight and diff (e.g., 480(+2), 500(新), ???(計不))
-                    if match:
-                        horse_data["horse_weight"] = int(match.group(1))
-                        horse_data["horse_weight_diff"] = match.group(2) # Keep diff as string (+2, -4, 新, 計不)
-                        logger.debug(f"Parsed weight: {horse_data['horse_weight']}, diff: {horse_data['horse_weight_diff']}")
-                    else:
-                        # Handle cases where only weight is present (e.g., "480")
-                        if weight_diff_text.isdigit():
-                             horse_data["horse_weight"] = int(weight_diff_text)
-                             horse_data["horse_weight_diff"] = None # No diff info
-                             logger.debug(f"Parsed weight (no diff): {horse_data['horse_weight']}")
-                        else:
-                             logger.warning(f"Could not parse weight/diff from: {weight_diff_text}")
-                             horse_data["weight_diff_raw"] = weight_diff_text # Store raw if parsing fails
-                else:
-                    horse_data["horse_weight"] = None
-                    horse_data["horse_weight_diff"] = None
-
-
-                # Attempt to extract Win Odds and Popularity from results table
-                if len(cells) > 13: # Check if odds/popularity cells exist (indices 12 and 13)
-                    horse_data["win_odds"] = clean_text(cells[12].text) # D1.1 (Final odds)
-                    horse_data["popularity"] = clean_text(cells[13].text) # D2.1 (Final popularity)
-                    logger.debug(f"Extracted odds: {horse_data['win_odds']}, popularity: {horse_data['popularity']}")
-                else:
-                    horse_data["win_odds"] = None
-                    horse_data["popularity"] = None
-                    logger.debug(f"Odds/Popularity cells missing for row: {row}")
-
-                # Add more extraction logic for B1 items available in the table
-
-                if "horse_id" in horse_data:  # Only add if we got the ID
-                    logger.debug(f"Found horse summary: {horse_data}")
-                    horses.append(horse_data)
+        
+        logger.warning("Horse list table found but no horses could be extracted from it")
 
     except Exception as e:
         logger.error(f"Error scraping horse list: {e}", exc_info=True)
@@ -616,14 +650,52 @@ def scrape_horse_list(soup: BeautifulSoup):
     return horses
 
 
+def scrape_horse_lists(urls: List[str], max_workers: int = 20,
+                       per_host_delay: float = 0.1) -> Dict[str, List[Dict]]:
+    """
+    Fetches race pages and scrapes their horse lists concurrently.
+    
+    Pages are fetched with requests (get_soup), so no WebDriver is shared between workers.
+    The first workers are started per_host_delay seconds apart to avoid a burst of requests
+    to netkeiba.
+    
+    Args:
+        urls: Race page URLs (shutuba or race DB pages)
+        max_workers: Maximum number of concurrent workers
+        per_host_delay: Delay in seconds between the starts of consecutive workers
+        
+    Returns:
+        Dictionary mapping each URL to its horse list (empty if the page could not be fetched)
+    """
+    def worker(index, url):
+        if index < max_workers:
+            time.sleep(index * per_host_delay)
+        
+        soup = get_soup(url)
+        if not soup:
+            return []
+        return scrape_horse_list(soup)
+    
+    logger.info(f"Scraping horse lists for {len(urls)} pages with up to {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, index, url) for index, url in enumerate(urls)]
+        return {url: future.result() for url, future in zip(urls, futures)}
+
+
 def scrape_horse_details(horse_id):
     """Scrapes detailed information for a single horse from its profile page."""
     horse_details = {"horse_id": horse_id}
     horse_url = f"{BASE_URL_NETKEIBA}/horse/{horse_id}"
-    soup = get_soup(horse_url)
-    if not soup:
+    html = _get_horse_page(horse_url, f"profile_{horse_id}")
+    if not html:
         logger.warning(f"Could not fetch horse details page for {horse_id}")
         return horse_details  # Return basic ID if page fetch fails
+    
+    # Only the profile, blood and results tables are built
+    soup = parse_html(html, parse_only=HORSE_DETAILS_STRAINER)
+    if soup.find("table") is None:
+        logger.debug(f"No detail tables kept for horse {horse_id}, parsing the full page")
+        soup = parse_html(html)
 
     try:
         # --- Extract Basic Info (B1) ---
@@ -635,25 +707,11 @@ def scrape_horse_details(horse_id):
                 data = row.find("td") # Corrected indentation
                 if header and data:
                     header_text = clean_text(header.text)
-                    data_text = clean_text(data.text)
                     # Check header_text is not None before using 'in'
-                    if header_text and "生年月日" in header_text:
-                        horse_details["birth_date"] = data_text
-                    elif header_text and "調教師" in header_text:
-                        horse_details["trainer_full"] = data_text  # Often includes affiliation
-                    elif header_text and "馬主" in header_text:
-                        horse_details["owner"] = data_text
-                    elif header_text and "生産者" in header_text:
-                        horse_details["producer"] = data_text
-                    elif header_text and "産地" in header_text:
-                        horse_details["origin"] = data_text
-                    elif header_text and "毛色" in header_text: # B1.10
-                        horse_details["coat_color"] = data_text
-                    elif header_text and "馬主" in header_text: # B1.8
-                        horse_details["owner"] = data_text
-                    elif header_text and "生産者" in header_text: # B1.9
-                        horse_details["producer"] = data_text
-                    # Add more B1 items if found in this table
+                    if header_text:
+                        field = next((field for label, field in PROFILE_FIELDS if label in header_text), None)
+                        if field:
+                            horse_details[field] = clean_text(data.text)
         else:
             logger.warning(f"Profile table 'db_prof_table' not found or not a Tag for horse {horse_id}")
 
@@ -665,15 +723,15 @@ def scrape_horse_details(horse_id):
             if len(rows) > 0:
                 cells = rows[0].find_all("td")
                 if len(cells) > 0:
-                     horse_details["father"] = clean_text(cells[0].text)
+                     horse_details["father"] = _cell_text(cells[0])
             if len(rows) > 1:
                  cells = rows[1].find_all("td")
                  if len(cells) > 0:
-                    horse_details["mother"] = clean_text(cells[0].text)
+                    horse_details["mother"] = _cell_text(cells[0])
             if len(rows) > 2:
                  cells = rows[2].find_all("td")
                  if len(cells) > 0:
-                    horse_details["mother_father"] = clean_text(cells[0].text)
+                    horse_details["mother_father"] = _cell_text(cells[0])
             # Add more B4 items if available directly
         else:
             logger.warning(f"Blood table 'blood_table' not found or not a Tag for horse {horse_id}")
@@ -686,18 +744,18 @@ def scrape_horse_details(horse_id):
             # Correct indentation for this block (should be indented under the if)
             rows = results_table.find_all("tr")
             for row in rows[1:]:  # Skip header
-                cells = row.find_all("td")
+                cells = row.find_all("td", recursive=False, limit=12)
                 # Check length before accessing potentially non-existent cells like cells[11] (Indent this block)
                 if len(cells) > 11: # Check if enough cells exist for rank etc.
                     race_name_tag = cells[4].find('a')
-                    race_name = clean_text(race_name_tag.text) if race_name_tag else clean_text(cells[4].text)
+                    race_name = clean_text(race_name_tag.text) if race_name_tag else _cell_text(cells[4])
                     result = {
-                         "date": clean_text(cells[0].text),
-                         "venue": clean_text(cells[1].text),
-                         "weather": clean_text(cells[2].text),
-                         "race_number": clean_text(cells[3].text),
+                         "date": _cell_text(cells[0]),
+                         "venue": _cell_text(cells[1]),
+                         "weather": _cell_text(cells[2]),
+                         "race_number": _cell_text(cells[3]),
                          "race_name": race_name,
-                         "rank": clean_text(cells[11].text) # Rank is often further down
+                         "rank": _cell_text(cells[11]) # Rank is often further down
                          # Add more B3 summary items like distance, jockey, time diff etc.
                      }
                     logger.debug(f"Added recent result summary for horse {horse_id}: {result}")
@@ -720,8 +778,8 @@ def scrape_horse_results(horse_id):
     logger.info(f"Scraping full results for horse {horse_id}...")
     results_data = {"conditions": {}, "results": []}
     results_url = f"{BASE_URL_NETKEIBA}/horse/result/{horse_id}"
-    soup = get_soup(results_url)
-    if not soup:
+    html = _get_horse_page(results_url, f"result_{horse_id}")
+    if not html:
         logger.warning(f"Could not fetch horse results page for {horse_id}")
         return results_data # Return empty data if page fetch fails
 
@@ -731,65 +789,27 @@ def scrape_horse_results(horse_id):
         results_data["conditions"] = {} # Ensure key exists but is empty
 
         # --- Extract detailed race results (B3 extension) ---
+        # The page is walked with lxml XPath directly rather than through a BeautifulSoup tree
         logger.debug("Looking for detailed results table (db_h_race_results nk_tb_common)...")
-        results_table = soup.find("table", class_="db_h_race_results nk_tb_common") # More specific selector
-        if results_table and isinstance(results_table, Tag):
-            rows = results_table.find_all("tr")
-        #    for row in rows[1:]: # Skip header
-        #        cells = row.find_all("td")
-        #        if len(cells) > 20: # Example check
-        #             race_result = {
-        #                 "date": clean_text(cells[0].text),
-        #                 # ... extract all B3 fields ...
-        #                 "time_diff": clean_text(cells[12].text), # Example
-        #                 "corner_passes": clean_text(cells[15].text), # Example
-        #                 "上がり3F": clean_text(cells[19].text), # Example
-        #             }
-        #             results_data["results"].append(race_result)
-        # else:
-            for row in rows[1:]: # Skip header
-                cells = row.find_all("td")
-                # Adjust expected cell count based on the actual table structure
+        doc = lxml.html.document_fromstring(html.encode("utf-8"), parser=HTML_UTF8_PARSER)
+        results_tables = RESULTS_TABLE_XPATH(doc)
+        if results_tables:
+            rows = ROWS_XPATH(results_tables[0])
+            for row_index, row in enumerate(rows[1:], start=1): # Skip header
+                cells = CELLS_XPATH(row)
                 # Corrected indices based on typical netkeiba horse result table structure
                 if len(cells) > 24: # Need at least 25 cells for 賞金 etc.
-                     # Extract data based on corrected cell index
-                     race_result = {
-                         "date": clean_text(cells[0].text),             # 日付
-                          "venue": clean_text(cells[1].text),            # 開催
-                          "weather": clean_text(cells[2].text),          # 天気
-                          "race_number": clean_text(cells[3].text),      # R
-                          "race_name": clean_text(cells[4].text),        # レース名
-                          "head_count": clean_text(cells[6].text),       # 頭数
-                          "waku": clean_text(cells[7].text),             # 枠番
-                          "umaban": clean_text(cells[8].text),           # 馬番
-                          "odds": clean_text(cells[9].text),             # オッズ
-                          "popularity": clean_text(cells[10].text),      # 人気
-                          "rank": clean_text(cells[11].text),            # 着順
-                          "jockey": clean_text(cells[12].text),          # 騎手
-                          "burden_weight": clean_text(cells[13].text),   # 斤量
-                          "distance": clean_text(cells[14].text),        # 距離
-                          "track_condition": clean_text(cells[15].text), # 馬場
-                          # "time_index": clean_text(cells[16].text),    # 指数 - Skip for now
-                          "time": clean_text(cells[17].text),            # タイム
-                          "time_diff": clean_text(cells[18].text),       # 着差
-                          # "prize_money_alt": clean_text(cells[19].text), # ﾀｲﾑ差 - Skip for now
-                          "corner_passes": clean_text(cells[20].text),   # 通過
-                          "pace": clean_text(cells[21].text),            # ペース
-                          "agari_3f": clean_text(cells[22].text),        # 上り
-                          "horse_weight": clean_text(cells[23].text),    # 馬体重
-                          "prize": clean_text(cells[24].text),           # 賞金 (may need adjustment)
-                          # TODO: B3.5 Time diff to 2nd place - often not directly here, might need calculation or different page
-                          # Add more fields if needed
-                      }
-                     # Clean up potentially empty fields
-                     race_result = {k: v for k, v in race_result.items() if v}
-                     results_data["results"].append(race_result)
-                     logger.debug(f"Added detailed result for horse {horse_id}: {race_result}")
+                    race_result = {}
+                    for field, index in RESULT_FIELD_INDEX:
+                        value = clean_text(cells[index].text_content())
+                        if value: # Skip empty fields
+                            race_result[field] = value
+                    results_data["results"].append(race_result)
+                    logger.debug("Added detailed result for horse %s: %s", horse_id, race_result)
                 else:
-                     logger.debug(f"Skipping row in detailed results due to insufficient cells ({len(cells)}): {row}")
+                    logger.debug("Skipping row %d in detailed results due to insufficient cells (%d)", row_index, len(cells))
         else:
-            logger.warning(f"Detailed results table 'db_h_race_results nk_tb_common' not found or not a Tag for horse {horse_id}")
-        # pass # Placeholder removed
+            logger.warning(f"Detailed results table 'db_h_race_results nk_tb_common' not found for horse {horse_id}")
 
     except Exception as e:
         logger.error(f"Error scraping results for horse {horse_id}: {e}", exc_info=True)
@@ -798,85 +818,70 @@ def scrape_horse_results(horse_id):
     return results_data
 
 
+def _parse_pedigree_table(ped_table: Tag) -> Dict[str, Dict]:
+    """
+    Maps the cells of a pedigree table (blood_table) to ancestors in one pass.
+    
+    Each ancestor cell spans the rows of its own ancestors, so its generation follows from its
+    rowspan relative to the first (sire) cell: on the 5-generation page rowspan 16 is
+    generation 1, 8 generation 2, ... and 1 generation 5. Within a generation the cells
+    alternate sire/dam in document order, and each cell is keyed by the path from the horse,
+    e.g. "mother_father" for the dam's sire.
+    
+    Args:
+        ped_table: blood_table Tag
+        
+    Returns:
+        Dictionary mapping ancestor keys to {"name", "url"}, for cells with a link, in table order
+    """
+    cells = ped_table.find_all("td")
+    if not cells:
+        return {}
+    
+    def rowspan(cell):
+        value = cell.get("rowspan", "1")
+        return int(value) if value.isdecimal() and int(value) > 0 else 1
+    
+    sire_rowspan = rowspan(cells[0])
+    path: List[str] = []
+    seen_per_generation: Dict[int, int] = {}
+    ancestors = {}
+    for cell in cells:
+        generation = max(sire_rowspan // rowspan(cell), 1).bit_length()
+        seen = seen_per_generation.get(generation, 0)
+        seen_per_generation[generation] = seen + 1
+        del path[generation - 1:]
+        if len(path) < generation - 1:  # Malformed table: parent cell missing
+            continue
+        path.append("father" if seen % 2 == 0 else "mother")
+        
+        link = cell.find("a")
+        if link:
+            ancestors["_".join(path)] = {"name": clean_text(cell.text), "url": link.get("href")}
+    return ancestors
+
+
 def scrape_pedigree(horse_id):
     """Scrapes detailed pedigree information (5 generations, crosses, siblings) for a horse.""" # Updated docstring
     logger.info(f"Scraping pedigree for horse {horse_id}...")
     pedigree_data = {"pedigree_5gen": {}, "crosses": [], "siblings": []} # Added siblings key
     pedigree_url = f"{BASE_URL_NETKEIBA}/horse/ped/{horse_id}"
-    soup = get_soup(pedigree_url)
-    if not soup:
+    html = _get_horse_page(pedigree_url, f"ped_{horse_id}", ttl=PEDIGREE_PAGE_CACHE_TTL)
+    if not html:
         logger.warning(f"Could not fetch horse pedigree page for {horse_id}")
         return pedigree_data # Return empty data if page fetch fails
+    soup = parse_html(html)
 
     try:
         # --- Extract 5-Generation Pedigree (B4.6) ---
         logger.debug("Looking for 5-generation pedigree table (blood_table)...")
         ped_table = soup.find("table", class_="blood_table")
-        pedigree_5gen_data = {} # Use a dictionary to store generations
         if ped_table and isinstance(ped_table, Tag):
-            # !!! WARNING: The following parsing uses fixed indices and is highly likely to be inaccurate !!!
-            # !!! due to varying rowspan values in the pedigree table. A robust parser would need     !!!
-            # !!! to analyze rowspan attributes to correctly map ancestors. This is a basic attempt.   !!!
-            logger.warning(f"Pedigree parsing for {horse_id} uses fixed indices and may be inaccurate due to complex table structure (rowspan).")
-            rows = ped_table.find_all("tr")
             try:
-                # Generation 1 (Parents) - Basic attempt
-                if len(rows) > 0:
-                    cells_g1 = rows[0].find_all("td")
-                    if len(cells_g1) > 0 and cells_g1[0].find("a"): pedigree_5gen_data["father"] = {"name": clean_text(cells_g1[0].text), "url": cells_g1[0].find("a").get("href")}
-                if len(rows) > 16: # Mother is often much lower due to rowspan
-                     cells_g1_mother = rows[16].find_all("td")
-                     if len(cells_g1_mother) > 0 and cells_g1_mother[0].find("a"): pedigree_5gen_data["mother"] = {"name": clean_text(cells_g1_mother[0].text), "url": cells_g1_mother[0].find("a").get("href")}
-
-                # Generation 2 (Grandparents) - Basic attempt
-                if len(rows) > 0: # Father's Father (FF)
-                    cells_g2_ff = rows[0].find_all("td")
-                    if len(cells_g2_ff) > 1 and cells_g2_ff[1].find("a"): pedigree_5gen_data["father_father"] = {"name": clean_text(cells_g2_ff[1].text), "url": cells_g2_ff[1].find("a").get("href")}
-                if len(rows) > 8: # Father's Mother (FM)
-                    cells_g2_fm = rows[8].find_all("td")
-                    if len(cells_g2_fm) > 0 and cells_g2_fm[0].find("a"): pedigree_5gen_data["father_mother"] = {"name": clean_text(cells_g2_fm[0].text), "url": cells_g2_fm[0].find("a").get("href")}
-                if len(rows) > 16: # Mother's Father (MF)
-                    cells_g2_mf = rows[16].find_all("td")
-                    if len(cells_g2_mf) > 1 and cells_g2_mf[1].find("a"): pedigree_5gen_data["mother_father"] = {"name": clean_text(cells_g2_mf[1].text), "url": cells_g2_mf[1].find("a").get("href")}
-                if len(rows) > 24: # Mother's Mother (MM)
-                    cells_g2_mm = rows[24].find_all("td")
-                    if len(cells_g2_mm) > 0 and cells_g2_mm[0].find("a"): pedigree_5gen_data["mother_mother"] = {"name": clean_text(cells_g2_mm[0].text), "url": cells_g2_mm[0].find("a").get("href")}
-
-                # Generation 3 (Great-Grandparents) - Basic attempt (Indices are estimates)
-                # ... (Existing G3 parsing kept, but still potentially inaccurate) ...
-                if len(rows) > 0: # FFF
-                    cells_g3_fff = rows[0].find_all("td")
-                    if len(cells_g3_fff) > 2 and cells_g3_fff[2].find("a"): pedigree_5gen_data["father_father_father"] = {"name": clean_text(cells_g3_fff[2].text), "url": cells_g3_fff[2].find("a").get("href")}
-                if len(rows) > 4: # FFM
-                    cells_g3_ffm = rows[4].find_all("td")
-                    if len(cells_g3_ffm) > 1 and cells_g3_ffm[1].find("a"): pedigree_5gen_data["father_father_mother"] = {"name": clean_text(cells_g3_ffm[1].text), "url": cells_g3_ffm[1].find("a").get("href")}
-                if len(rows) > 8: # FMF
-                    cells_g3_fmf = rows[8].find_all("td")
-                    if len(cells_g3_fmf) > 1 and cells_g3_fmf[1].find("a"): pedigree_5gen_data["father_mother_father"] = {"name": clean_text(cells_g3_fmf[1].text), "url": cells_g3_fmf[1].find("a").get("href")}
-                if len(rows) > 12: # FMM
-                    cells_g3_fmm = rows[12].find_all("td")
-                    if len(cells_g3_fmm) > 0 and cells_g3_fmm[0].find("a"): pedigree_5gen_data["father_mother_mother"] = {"name": clean_text(cells_g3_fmm[0].text), "url": cells_g3_fmm[0].find("a").get("href")}
-                # Mother's side
-                if len(rows) > 16: # MFF
-                    cells_g3_mff = rows[16].find_all("td")
-                    if len(cells_g3_mff) > 2 and cells_g3_mff[2].find("a"): pedigree_5gen_data["mother_father_father"] = {"name": clean_text(cells_g3_mff[2].text), "url": cells_g3_mff[2].find("a").get("href")}
-                if len(rows) > 20: # MFM
-                    cells_g3_mfm = rows[20].find_all("td")
-                    if len(cells_g3_mfm) > 1 and cells_g3_mfm[1].find("a"): pedigree_5gen_data["mother_father_mother"] = {"name": clean_text(cells_g3_mfm[1].text), "url": cells_g3_mfm[1].find("a").get("href")}
-                if len(rows) > 24: # MMF
-                    cells_g3_mmf = rows[24].find_all("td")
-                    if len(cells_g3_mmf) > 1 and cells_g3_mmf[1].find("a"): pedigree_5gen_data["mother_mother_father"] = {"name": clean_text(cells_g3_mmf[1].text), "url": cells_g3_mmf[1].find("a").get("href")}
-                if len(rows) > 28: # MMM
-                    cells_g3_mmm = rows[28].find_all("td")
-                    if len(cells_g3_mmm) > 0 and cells_g3_mmm[0].find("a"): pedigree_5gen_data["mother_mother_mother"] = {"name": clean_text(cells_g3_mmm[0].text), "url": cells_g3_mmm[0].find("a").get("href")}
-
-                # TODO: Extend logic for Generations 4, 5 - Requires robust rowspan parsing.
-                logger.info(f"Partially parsed 5-gen pedigree (attempted Gen 1-3, accuracy limited) for horse {horse_id}.")
-
+                pedigree_data["pedigree_5gen"] = _parse_pedigree_table(ped_table)
+                logger.info(f"Parsed {len(pedigree_data['pedigree_5gen'])} ancestors from the pedigree table for horse {horse_id}.")
             except Exception as ped_parse_err:
-                logger.error(f"Error during basic pedigree parsing for {horse_id}: {ped_parse_err}", exc_info=True)
-
-            pedigree_data["pedigree_5gen"] = pedigree_5gen_data # Store the parsed data
+                logger.error(f"Error during pedigree parsing for {horse_id}: {ped_parse_err}", exc_info=True)
         else:
             logger.warning(f"Pedigree table 'blood_table' not found or not a Tag for horse {horse_id}")
 
@@ -896,19 +901,19 @@ def scrape_pedigree(horse_id):
         # --- Extract Siblings (B4.5) ---
         logger.debug("Looking for sibling information (兄弟馬)...")
         # Sibling info might be in a table with class 'list_table' or similar, often after pedigree
-        sibling_section = soup.find("h3", string=re.compile("兄弟馬")) # Find header for siblings
+        sibling_section = soup.find("h3", string=SIBLINGS_HEADER_RE) # Find header for siblings
         if sibling_section:
-            sibling_table = sibling_section.find_next_sibling("table", class_=re.compile("race_table|list_table")) # Find next table
+            sibling_table = sibling_section.find_next_sibling("table", class_=SIBLINGS_TABLE_CLASS_RE) # Find next table
             if sibling_table and isinstance(sibling_table, Tag):
                 rows = sibling_table.find_all("tr")
                 for row in rows[1:]: # Skip header
-                    cells = row.find_all("td")
+                    cells = row.find_all("td", recursive=False, limit=2)
                     if len(cells) > 1: # Need at least name and maybe wins
                         sibling_link = cells[0].find("a")
-                        sibling_name = clean_text(sibling_link.text) if sibling_link else clean_text(cells[0].text)
+                        sibling_name = clean_text(sibling_link.text) if sibling_link else _cell_text(cells[0])
                         sibling_url = sibling_link.get("href") if sibling_link else None
                         # Extract other details like wins/status if available
-                        sibling_status = clean_text(cells[1].text) if len(cells) > 1 else None
+                        sibling_status = _cell_text(cells[1]) if len(cells) > 1 else None
                         pedigree_data["siblings"].append({
                             "name": sibling_name,
                             "url": sibling_url,
@@ -928,31 +933,128 @@ def scrape_pedigree(horse_id):
     return pedigree_data
 
 
+def scrape_horse_all(horse_id: str) -> Dict[str, Dict]:
+    """
+    Scrapes the profile, results and pedigree pages of a horse concurrently.
+    
+    The three pages are independent, so they are fetched on a small thread pool over the
+    shared keep-alive session instead of as three sequential round-trips (see
+    scrape_horses_all). Each page is parsed by its own scraper, so a failed fetch only
+    empties that part.
+    
+    Args:
+        horse_id: netkeiba horse ID
+        
+    Returns:
+        Dictionary with "details", "results" and "pedigree" entries, as returned by
+        scrape_horse_details, scrape_horse_results and scrape_pedigree
+    """
+    return scrape_horses_all([horse_id], max_workers=3, per_host_delay=0)[horse_id]
+
+
+def scrape_horses_all(horse_ids: List[str], max_workers: int = 8,
+                      per_host_delay: float = 0.1) -> Dict[str, Dict[str, Dict]]:
+    """
+    Scrapes the profile, results and pedigree pages of several horses concurrently.
+    
+    Every page of every horse is a separate job on one thread pool, so round-trips overlap
+    across horses as well as within one. The first workers are started per_host_delay
+    seconds apart to avoid a burst of requests to netkeiba.
+    
+    Args:
+        horse_ids: netkeiba horse IDs
+        max_workers: Maximum number of concurrent workers
+        per_host_delay: Delay in seconds between the starts of consecutive workers
+        
+    Returns:
+        Dictionary mapping each horse ID to its scrape_horse_all result
+    """
+    scrapers = (
+        ("details", scrape_horse_details),
+        ("results", scrape_horse_results),
+        ("pedigree", scrape_pedigree),
+    )
+    jobs = [(horse_id, key, scraper) for horse_id in horse_ids for key, scraper in scrapers]
+    
+    def worker(index, scraper, horse_id):
+        if index < max_workers:
+            time.sleep(index * per_host_delay)
+        return scraper(horse_id)
+    
+    horse_pages = {horse_id: {} for horse_id in horse_ids}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, index, scraper, horse_id)
+                   for index, (horse_id, _, scraper) in enumerate(jobs)]
+        for (horse_id, key, _), future in zip(jobs, futures):
+            horse_pages[horse_id][key] = future.result()
+    return horse_pages
+
+
+def _fetch_static_training_html(training_url: str) -> Optional[str]:
+    """
+    Fetches a training page over plain HTTP, without a browser.
+    
+    Returns the HTML only if it already contains a workout table; None if the tables are
+    rendered by JavaScript or the request failed, in which case the caller falls back to Selenium.
+    The page is parsed for an actual <table> with a workout class token, since a JavaScript
+    shell can name the classes in its scripts or styles without containing the table.
+    """
+    html = get_html(training_url)
+    if html and parse_html(html, parse_only=TRAINING_TABLE_STRAINER).find("table") is not None:
+        return html
+    return None
+
+
 def scrape_training(driver: WebDriver, horse_id: str): # Accept driver as argument and add type hints
-    """Scrapes training information (B5) for a horse using Selenium."""
+    """
+    Scrapes training information (B5) for a horse.
+    
+    The page comes from the disk cache, or over plain HTTP when the workout tables are in the
+    static HTML; Selenium is only used when they are rendered by JavaScript.
+    """
     logger.info(f"Scraping training info for horse {horse_id}...")
     training_data = {"workouts": [], "comments": []} # Added comments key
-    if not driver:
+    training_url = f"{BASE_URL_NETKEIBA}/horse/training/{horse_id}" # Assumed URL structure
+    page_source = _get_cached_page(f"training_{horse_id}", TRAINING_PAGE_CACHE_TTL)
+    if page_source is not None:
+        logger.info(f"Using cached training page for horse {horse_id}")
+    else:
+        page_source = _fetch_static_training_html(training_url)
+        if page_source is not None:
+            logger.info(f"Training tables found in static HTML for horse {horse_id}, skipping Selenium")
+            _put_cached_page(f"training_{horse_id}", page_source)
+        else:
+            logger.debug(f"Training tables not in static HTML for horse {horse_id}")
+    if page_source is None and not driver:
         logger.error("WebDriver not initialized. Cannot scrape training info.")
         return training_data
-    training_url = f"{BASE_URL_NETKEIBA}/horse/training/{horse_id}" # Assumed URL structure
-    logger.info(f"Fetching training page with Selenium: {training_url}")
 
     try:
-        driver.get(training_url)
-        time.sleep(SELENIUM_WAIT_TIME) # Wait for potential dynamic content
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
+        if page_source is None:
+            logger.info(f"Fetching training page with Selenium: {training_url}")
+            # Only the DOM is read, so images, styles, fonts and trackers are not loaded
+            with blocked_resources(driver):
+                driver.get(training_url)
+                try:
+                    WebDriverWait(driver, SELENIUM_WAIT_TIME).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, TRAINING_TABLE_SELECTOR))
+                    )
+                    table_rendered = True
+                except TimeoutException:
+                    logger.debug(f"No training table rendered within {SELENIUM_WAIT_TIME}s for horse {horse_id}")
+                    table_rendered = False
+                page_source = driver.page_source
+            # A page that timed out may be a partial render, so it is parsed but not cached
+            if table_rendered:
+                _put_cached_page(f"training_{horse_id}", page_source)
+        soup = parse_html(page_source)
         logger.debug(f"Successfully fetched training page source for horse {horse_id}")
 
         # --- Extract Training Details (B5.1 - B5.7) ---
         logger.debug(f"Looking for training tables...")
         
-        training_tables = []
-        for table_class in ["WorkDataTable", "oikiri_table", "table_slide_body WorkDataTable"]:
-            tables = soup.find_all("table", class_=table_class)
-            if tables:
-                training_tables.extend(tables)
+        # One pass in document order; "table_slide_body WorkDataTable" tables match the WorkDataTable token
+        training_tables = soup.find_all("table", class_=TRAINING_TABLE_CLASS_RE)
         
         if training_tables:
             training_data["workouts"] = []
@@ -963,31 +1065,31 @@ def scrape_training(driver: WebDriver, horse_id: str): # Accept driver as argume
                     
                 rows = training_table.find_all("tr")
                 for row in rows[1:]:  # Skip header
-                    cells = row.find_all("td")
+                    cells = row.find_all("td", recursive=False, limit=8)
                     
                     if len(cells) >= 8:  # Basic check for valid row
                         # Combine location details for better context
-                        location_detail = f"{clean_text(cells[1].text)} {clean_text(cells[2].text)} ({clean_text(cells[3].text)})"
+                        location_detail = f"{_cell_text(cells[1])} {_cell_text(cells[2])} ({_cell_text(cells[3])})"
                         
                         workout = {
-                            "date": clean_text(cells[0].text),              # B5.1, B5.5 (日付)
+                            "date": _cell_text(cells[0]),                   # B5.1, B5.5 (日付)
                             "location_detail": location_detail,             # B5.1, B5.5 (場所, コース, 馬場状態 - B5.8 partially)
-                            "time_total": clean_text(cells[4].text),        # B5.2, B5.5 (全体時計)
-                            "time_laps": clean_text(cells[5].text),         # B5.3, B5.5 (ラップタイム)
-                            "intensity": clean_text(cells[6].text),         # B5.4, B5.5 (強度)
-                            "partner_info": clean_text(cells[7].text),      # B5.7 (併せ馬情報)
+                            "time_total": _cell_text(cells[4]),             # B5.2, B5.5 (全体時計)
+                            "time_laps": _cell_text(cells[5]),              # B5.3, B5.5 (ラップタイム)
+                            "intensity": _cell_text(cells[6]),              # B5.4, B5.5 (強度)
+                            "partner_info": _cell_text(cells[7]),           # B5.7 (併せ馬情報)
                         }
                         
                         # Extract additional details for B5.8, B5.9
-                        slope_match = re.search(r"坂路\s*([^(]*)", location_detail)
+                        slope_match = SLOPE_LOCATION_RE.search(location_detail)
                         if slope_match:
                             workout["slope_condition"] = clean_text(slope_match.group(1))
                             
-                        wcourse_match = re.search(r"W(内|外|直)", location_detail)
+                        wcourse_match = WOOD_COURSE_RE.search(location_detail)
                         if wcourse_match:
                             workout["wcourse_position"] = wcourse_match.group(1)
                             
-                        video_link = row.find("a", href=re.compile(r"video"))
+                        video_link = row.find("a", href=VIDEO_HREF_RE)
                         if video_link and "href" in video_link.attrs:
                             workout["video_url"] = video_link["href"]
                         
@@ -1002,7 +1104,7 @@ def scrape_training(driver: WebDriver, horse_id: str): # Accept driver as argume
         
         # --- Extract Stable Comments (B5.12) ---
         logger.debug("Looking for stable comments section...")
-        comment_section = soup.find("div", class_=re.compile("comment", re.IGNORECASE)) # Guessing class name
+        comment_section = soup.find("div", class_=COMMENT_CLASS_RE) # Guessing class name
         if comment_section and isinstance(comment_section, Tag):
             # Comments might be in <p> tags or list items <li>
             comments = comment_section.find_all(['p', 'li'])
@@ -12,6 +12,9 @@ from config import BASE_URL_NETKEIBA
 # Get logger instance
 logger = get_logger(__name__)
 
+# Precompiled patterns for the profile page tables
+STATS_TABLE_CLASS_RE = re.compile(r"race_table_01|nk_tb_common")
+
 
 def scrape_jockey_profile(jockey_id):
     """Scrapes profile information for a jockey."""
@@ -46,7 +49,7 @@ def scrape_jockey_profile(jockey_id):
         # --- Extract Jockey Stats (C1.2 - C1.7) ---
         # Stats are often in subsequent tables. Let's look for tables with class 'race_table_01' or similar.
         logger.debug(f"Looking for jockey stats tables (e.g., race_table_01 nk_tb_common) on {profile_url}...")
-        stats_tables = soup.find_all("table", class_=re.compile(r"race_table_01|nk_tb_common")) # Find potential stats tables
+        stats_tables = soup.find_all("table", class_=STATS_TABLE_CLASS_RE) # Find potential stats tables
 
         if not stats_tables:
              logger.warning(f"Could not find any potential stats tables for jockey {jockey_id}")
@@ -14,13 +14,25 @@ from selenium.webdriver.support import expected_conditions as EC # Added import
 
 
 # Import shared utilities and config
-from utils import clean_text
+from utils import clean_text, parse_html
 from logger_config import get_logger
 from config import SELENIUM_WAIT_TIME
 
 # Get logger instance
 logger = get_logger(__name__)
 
+# Precompiled patterns for the live win/place odds table rows
+ODDS_TABLE_CLASS_RE = re.compile(r"Odds_Table|RaceOdds_Table")
+HEADER_ROW_CLASS_RE = re.compile(r"Header|Heading")
+HORSE_NAME_CLASS_RE = re.compile(r"HorseName|Horse_Name")
+DIGITS_RE = re.compile(r'^\d+$')
+ODDS_VALUE_RE = re.compile(r'^[\d.]+$')
+ODDS_RANGE_RE = re.compile(r'^[\d.]+-[\d.]+$')
+JAPANESE_TEXT_RE = re.compile(r'[ぁ-んァ-ンー一-龯]')
+ODDS_NUMBER_RE = re.compile(r'([\d.]+)')
+PLACE_ODDS_RE = re.compile(r'([\d.]+-[\d.]+|[\d.]+)')
+DECIMAL_ODDS_TEXT_RE = re.compile(r"\d+\.\d+")
+
 
 def scrape_odds(race_soup: BeautifulSoup, race_id: str):
     """Scrapes odds/payout information (D1 - Payouts only) from the main race result page soup."""
@@ -239,7 +251,7 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
 
         # --- Helper function to get soup after potential AJAX loads ---
         def get_current_soup(webdriver):
-            return BeautifulSoup(webdriver.page_source, "html.parser")
+            return parse_html(webdriver.page_source)
 
         # --- Scrape Tan/Fuku (Initial View) ---
         soup = get_current_soup(driver)
@@ -255,9 +267,9 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
             
         # Try 2025 format containers if traditional not found
         if not tan_fuku_table:
-            odds_tables = soup.find_all("table", class_=re.compile(r"Odds_Table|RaceOdds_Table"))
+            odds_tables = soup.find_all("table", class_=ODDS_TABLE_CLASS_RE)
             for table in odds_tables:
-                header_row = table.find("tr", class_=re.compile(r"Header|Heading"))
+                header_row = table.find("tr", class_=HEADER_ROW_CLASS_RE)
                 if header_row:
                     header_cells = header_row.find_all(["th", "td"])
                     header_texts = [clean_text(cell.text) for cell in header_cells]
@@ -274,7 +286,7 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
                     first_data_row = rows[1]
                     cells = first_data_row.find_all(["td", "th"])
                     # Check if this row has a horse number and potential odds
-                    if len(cells) >= 3 and re.match(r'^\d+$', clean_text(cells[0].text)):
+                    if len(cells) >= 3 and DIGITS_RE.match(clean_text(cells[0].text)):
                         tan_fuku_table = table
                         logger.debug("Found potential Tan/Fuku table by structure analysis")
                         break
@@ -296,19 +308,19 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
                         else:
                             umaban = clean_text(umaban_cell.text)
                             
-                        if not umaban or not re.match(r'^\d+$', umaban):
+                        if not umaban or not DIGITS_RE.match(umaban):
                             continue
                         
                         # Extract horse name - usually in second column or in a specific span
                         horse_name = None
                         if len(cells) > 1:
-                            horse_name_tag = cells[1].find("span", class_=re.compile(r"HorseName|Horse_Name"))
+                            horse_name_tag = cells[1].find("span", class_=HORSE_NAME_CLASS_RE)
                             if horse_name_tag:
                                 horse_name = clean_text(horse_name_tag.text)
                             else:
                                 horse_name = clean_text(cells[1].text)
                                 
-                                if re.match(r'^[\d.]+$', horse_name):
+                                if ODDS_VALUE_RE.match(horse_name):
                                     horse_name = None
                         
                         tan_odds = None
@@ -318,14 +330,14 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
                         if len(cells) > 2:
                             for i in range(1, min(4, len(cells))):
                                 cell_text = clean_text(cells[i].text) if cells[i].text else ""
-                                if cell_text and (re.match(r'^[\d.]+$', cell_text) or re.match(r'^[\d.]+-[\d.]+$', cell_text)):
+                                if cell_text and (ODDS_VALUE_RE.match(cell_text) or ODDS_RANGE_RE.match(cell_text)):
                                     if tan_odds is None:
                                         tan_odds = cell_text
                                     elif fuku_odds is None:
                                         fuku_odds = cell_text
-                                elif cell_text and horse_name is None and re.search(r'[ぁ-んァ-ンー一-龯]', cell_text):
+                                elif cell_text and horse_name is None and JAPANESE_TEXT_RE.search(cell_text):
                                     horse_name = cell_text
-                                elif cell_text and re.match(r'^[\d.]+$', cell_text) and tan_odds is None:
+                                elif cell_text and ODDS_VALUE_RE.match(cell_text) and tan_odds is None:
                                     # Check if this is a popularity column by class or position
                                     if "popularity" in cells[i].get("class", []) or i >= 4:
                                         popularity = cell_text
@@ -335,14 +347,14 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
                         if tan_odds is None and len(cells) > 2:
                             tan_odds_text = clean_text(cells[2].text)
                             if tan_odds_text and tan_odds_text != "---":
-                                odds_match = re.search(r'([\d.]+)', tan_odds_text)
+                                odds_match = ODDS_NUMBER_RE.search(tan_odds_text)
                                 if odds_match:
                                     tan_odds = odds_match.group(1)
                         
                         if fuku_odds is None and len(cells) > 3:
                             fuku_text = clean_text(cells[3].text)
                             if fuku_text and fuku_text != "---":
-                                odds_match = re.search(r'([\d.]+-[\d.]+|[\d.]+)', fuku_text)
+                                odds_match = PLACE_ODDS_RE.search(fuku_text)
                                 if odds_match:
                                     fuku_odds = odds_match.group(1)
                         
@@ -572,7 +584,7 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
             #     pass
             logger.warning(f"Sanrenpuku parsing logic is complex and not fully implemented. Needs specific page analysis.")
             # Placeholder: Try finding any odds-like text within the container
-            odds_elements = container_soup.find_all(string=re.compile(r"\d+\.\d+")) # Find text matching odds pattern
+            odds_elements = container_soup.find_all(string=DECIMAL_ODDS_TEXT_RE) # Find text matching odds pattern
             if odds_elements:
                  logger.debug(f"Found {len(odds_elements)} potential Sanrenpuku odds elements (unstructured).")
                  odds_list.append({"raw_data_found": len(odds_elements)}) # Indicate data was found but not parsed structuredly
@@ -592,7 +604,7 @@ def scrape_live_odds(driver: WebDriver, race_id: str): # Accept driver instance
             # Requires significant interaction simulation or complex table parsing
             logger.warning(f"Sanrentan parsing logic is extremely complex and not fully implemented. Needs specific page analysis.")
             # Placeholder: Try finding any odds-like text within the container
-            odds_elements = container_soup.find_all(string=re.compile(r"\d+\.\d+")) # Find text matching odds pattern
+            odds_elements = container_soup.find_all(string=DECIMAL_ODDS_TEXT_RE) # Find text matching odds pattern
             if odds_elements:
                  logger.debug(f"Found {len(odds_elements)} potential Sanrentan odds elements (unstructured).")
                  odds_list.append({"raw_data_found": len(odds_elements)}) # Indicate data was found but not parsed structuredly
@@ -4,18 +4,24 @@ Scraping functions related to horse condition and paddock information.
 import re
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from utils import clean_text
+from utils import clean_text, parse_html
 from logger_config import get_logger
 from config import SELENIUM_WAIT_TIME
 
 logger = get_logger(__name__)
 
+# Precompiled patterns for the per-horse paddock condition text
+SWEAT_RE = re.compile(r"汗:(.*?)(?:\s|$)")
+MUSCLE_RE = re.compile(r"体つき:(.*?)(?:\s|$)")
+MENTAL_RE = re.compile(r"気配:(.*?)(?:\s|$)")
+WALKING_RE = re.compile(r"歩様:(.*?)(?:\s|$)")
+
 
 def scrape_paddock_info(driver: WebDriver, race_id: str):
     """Scrapes horse condition and paddock information (B6) for a race."""
@@ -40,7 +46,7 @@ def scrape_paddock_info(driver: WebDriver, race_id: str):
             logger.error(f"Timeout or error waiting for paddock page elements: {e}")
             return paddock_data
         
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        soup = parse_html(driver.page_source)
         
         paddock_comments_div = soup.find("div", class_="Paddock_Comment")
         if paddock_comments_div:
@@ -65,19 +71,19 @@ def scrape_paddock_info(driver: WebDriver, race_id: str):
                     }
                     
                     if condition_div:
-                        sweat_match = re.search(r"汗:(.*?)(?:\s|$)", condition_div.text)
+                        sweat_match = SWEAT_RE.search(condition_div.text)
                         if sweat_match:
                             horse_data["sweating"] = clean_text(sweat_match.group(1))
                         
-                        muscle_match = re.search(r"体つき:(.*?)(?:\s|$)", condition_div.text)
+                        muscle_match = MUSCLE_RE.search(condition_div.text)
                         if muscle_match:
                             horse_data["muscle_condition"] = clean_text(muscle_match.group(1))
                         
-                        mental_match = re.search(r"気配:(.*?)(?:\s|$)", condition_div.text)
+                        mental_match = MENTAL_RE.search(condition_div.text)
                         if mental_match:
                             horse_data["mental_state"] = clean_text(mental_match.group(1))
                         
-                        walking_match = re.search(r"歩様:(.*?)(?:\s|$)", condition_div.text)
+                        walking_match = WALKING_RE.search(condition_div.text)
                         if walking_match:
                             horse_data["walking_style"] = clean_text(walking_match.group(1))
                     
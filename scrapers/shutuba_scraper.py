@@ -4,17 +4,20 @@ Scraping functions related to the shutuba_past page (detailed past performance).
 import re
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from selenium.webdriver.remote.webdriver import WebDriver # Import WebDriver for type hinting
 
 # Import shared utilities and config
-from utils import clean_text
+from utils import clean_text, parse_html
 from logger_config import get_logger
 from config import SHUTUBA_PAST_URL, SELENIUM_WAIT_TIME
 
 # Get logger instance
 logger = get_logger(__name__)
 
+# Precompiled pattern for the per-row umaban cleanup
+NON_DIGIT_RE = re.compile(r'\D')
+
 
 def scrape_shutuba_past(driver: WebDriver, race_id: str):
     """Scrapes detailed past performance (last 5 races) using Selenium."""
@@ -30,7 +33,7 @@ def scrape_shutuba_past(driver: WebDriver, race_id: str):
         driver.get(shutuba_url)
         time.sleep(SELENIUM_WAIT_TIME) # Wait for JavaScript to load the table
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
+        soup = parse_html(page_source)
         logger.debug(f"Successfully fetched shutuba_past page source for race {race_id}")
 
         table = soup.find("table", class_="Shutuba_Past5_Table")
@@ -83,7 +86,7 @@ def scrape_shutuba_past(driver: WebDriver, race_id: str):
                     umaban_str = clean_text(cells[1].text)
                     logger.debug(f"Extracted umaban from second cell text: {umaban_str}")
                 
-                umaban_str = re.sub(r'\D', '', umaban_str)  # Remove non-digits
+                umaban_str = NON_DIGIT_RE.sub('', umaban_str)  # Remove non-digits
                 
                 if not umaban_str or not umaban_str.isdigit():
                     logger.warning(f"Could not parse umaban from cells: {[cell.text for cell in cells[:2]]}")
@@ -12,6 +12,12 @@ from config import BASE_URL_NETKEIBA
 
 logger = get_logger(__name__)
 
+# Precompiled patterns for the speed figure table rows
+FIGURE_TABLE_CLASS_RE = re.compile(r"race_table_01|RaceTable01|SpeedFigureTable")
+HORSE_HREF_RE = re.compile(r"/horse/\d+")
+HORSE_ID_RE = re.compile(r"/horse/(\d+)")
+NON_KEY_CHARS_RE = re.compile(r'[^a-zA-Z0-9_]')
+
 
 def scrape_speed_figures(race_id, horse_id=None):
     """Scrapes speed figures and performance metrics (B7) for a race or specific horse."""
@@ -29,7 +35,7 @@ def scrape_speed_figures(race_id, horse_id=None):
         return speed_data
     
     try:
-        figure_table = soup.find("table", class_=re.compile(r"race_table_01|RaceTable01|SpeedFigureTable"))
+        figure_table = soup.find("table", class_=FIGURE_TABLE_CLASS_RE)
         if figure_table and isinstance(figure_table, Tag):
             rows = figure_table.find_all("tr")
             headers = []
@@ -43,10 +49,10 @@ def scrape_speed_figures(race_id, horse_id=None):
                 if len(cells) < len(headers):
                     continue
                     
-                horse_link = row.find("a", href=re.compile(r"/horse/\d+"))
+                horse_link = row.find("a", href=HORSE_HREF_RE)
                 row_horse_id = None
                 if horse_link:
-                    horse_id_match = re.search(r"/horse/(\d+)", horse_link["href"])
+                    horse_id_match = HORSE_ID_RE.search(horse_link["href"])
                     if horse_id_match:
                         row_horse_id = horse_id_match.group(1)
                 
@@ -71,7 +77,7 @@ def scrape_speed_figures(race_id, horse_id=None):
                             elif "上昇度" in header:  # B7.7 Improvement Rating
                                 horse_figures["improvement_rating"] = value
                             else:
-                                clean_header = re.sub(r'[^a-zA-Z0-9_]', '_', header).lower()
+                                clean_header = NON_KEY_CHARS_RE.sub('_', header).lower()
                                 horse_figures[clean_header] = value
                 
                 speed_data["figures"][row_key] = horse_figures
@@ -12,6 +12,10 @@ from config import BASE_URL_NETKEIBA
 # Get logger instance
 logger = get_logger(__name__)
 
+# Precompiled patterns for the profile page tables
+STATS_TABLE_CLASS_RE = re.compile(r"race_table_01|nk_tb_common")
+COMMENT_CLASS_RE = re.compile("comment", re.IGNORECASE)
+
 
 def scrape_trainer_profile(trainer_id):
     """Scrapes profile information for a trainer."""
@@ -45,7 +49,7 @@ def scrape_trainer_profile(trainer_id):
         # --- Extract Trainer Stats (C2.2 - C2.7) ---
         # Similar to jockey, stats are often in subsequent tables.
         logger.debug(f"Looking for trainer stats tables (e.g., race_table_01 nk_tb_common) on {profile_url}...")
-        stats_tables = soup.find_all("table", class_=re.compile(r"race_table_01|nk_tb_common")) # Find potential stats tables
+        stats_tables = soup.find_all("table", class_=STATS_TABLE_CLASS_RE) # Find potential stats tables
 
         if not stats_tables:
              logger.warning(f"Could not find any potential stats tables for trainer {trainer_id}")
@@ -152,7 +156,7 @@ def scrape_trainer_profile(trainer_id):
         # !!! SELECTOR VERIFICATION NEEDED: Common patterns include divs with class 'Comment' or similar. !!!
         logger.debug("Looking for stable comments section...")
         # Comments might be associated with the profile or recent news sections
-        comment_section = soup.find("div", class_=re.compile("comment", re.IGNORECASE)) # General guess
+        comment_section = soup.find("div", class_=COMMENT_CLASS_RE) # General guess
         trainer_data["comments"] = [] # Initialize comments list
         if comment_section and isinstance(comment_section, Tag):
             # Comments might be in <p> tags or list items <li>
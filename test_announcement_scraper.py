@@ -0,0 +1,149 @@
+"""
+Tests for the race announcement scraper.
+"""
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+
+from config import ANNOUNCEMENT_CACHE_TTL
+from scrapers import announcement_scraper
+from scrapers.announcement_scraper import (
+    _extract_news_fields,
+    _is_cache_entry_fresh,
+    _iter_news_items,
+    _parse_race_announcements,
+)
+from utils import clean_text
+
+
+ANNOUNCEMENT_TYPES = [
+    (r"出走取消|取消", "scratch"),
+    (r"騎手変更", "jockey_change"),
+    (r"馬場|コース変更", "track_change"),
+    (r"発走時刻|時刻変更", "start_time_change"),
+    (r"不利|妨害|制裁", "stewards_inquiry"),
+]
+
+
+def _reference_announcements(page_source):
+    """Announcement extraction of the original BeautifulSoup implementation."""
+    soup = BeautifulSoup(page_source, "html.parser")
+    announcement_list = soup.find("div", class_="Race_News_List")
+    if not announcement_list:
+        return []
+
+    announcements = []
+    for item in announcement_list.find_all(["dl", "div"], class_=re.compile(r"News_Item|NewsItem")):
+        date_element = item.find(["dt", "div"], class_=re.compile(r"News_Date|NewsDate"))
+        title_element = item.find(["dd", "div"], class_=re.compile(r"News_Title|NewsTitle"))
+        content_element = item.find(["dd", "div"], class_=re.compile(r"News_Text|NewsText"))
+        if not (title_element or content_element):
+            continue
+        announcement = {
+            "datetime": clean_text(date_element.text) if date_element else None,
+            "title": clean_text(title_element.text) if title_element else None,
+            "content": clean_text(content_element.text) if content_element else None,
+            "announcement_type": None,
+        }
+        if announcement["title"]:
+            announcement["announcement_type"] = next(
+                (name for pattern, name in ANNOUNCEMENT_TYPES if re.search(pattern, announcement["title"])), None)
+        announcements.append(announcement)
+    return announcements
+
+
+def _page(body):
+    return f"<html><head><meta charset=\"EUC-JP\"></head><body>{body}</body></html>"
+
+
+NEWS_LIST = """
+<div class="Header"><dl class="News_Item"><dd class="News_Title">ヘッダー 取消</dd></dl></div>
+<div class="Race_News_List">
+  <dl class="News_Item">
+    <dt class="News_Date">  2025/05/04
+      09:12 </dt>
+    <dd class="News_Title">4番 出走取消</dd>
+    <dd class="News_Text">  右前肢跛行のため\n\t出走取消 </dd>
+  </dl>
+  <div class="NewsItem Important">
+    <div class="NewsDate">10:00</div>
+    <div class="NewsTitle">騎手変更 <span>(負傷)</span></div>
+  </div>
+  <dl class="News_Item"><dt class="News_Date">10:30</dt><dd class="News_Text">本文のみ</dd></dl>
+  <dl class="News_Item"><dt class="News_Date">10:45</dt></dl>
+  <dl class="News_Item"><dd class="News_Title">馬場状態 変更 (不利)</dd></dl>
+  <dl class="News_Item"><dd class="News_Title">発走時刻変更</dd>
+    <dd class="News_Text"><div class="News_Item"><div class="News_Title">制裁 内容</div></div></dd></dl>
+  <div class="News_Item"><div class="News_Title">お知らせ</div><div class="News_Title">二つ目</div></div>
+  <p>リスト外の段落</p>
+</div>
+<div class="Race_News_List"><dl class="News_Item"><dd class="News_Title">二つ目のリスト</dd></dl></div>
+"""
+
+
+@pytest.mark.parametrize("body", [
+    NEWS_LIST,
+    "<div class=\"Race_News_List\"></div>",
+    "<div class=\"Other_List\"><dl class=\"News_Item\"><dd class=\"News_Title\">取消</dd></dl></div>",
+    "<div class=\"Race_News_List\">" + "<dl class=\"News_Item\"><dt class=\"News_Date\">09:00</dt>"
+    "<dd class=\"News_Title\">お知らせ</dd><dd class=\"News_Text\">本文</dd></dl>" * 300 + "</div>",
+])
+def test_announcements_match_beautifulsoup_reference(body):
+    page_source = _page(body)
+
+    result = _parse_race_announcements(page_source, "202505030811")
+
+    assert result == {"race_id": "202505030811", "announcements": _reference_announcements(page_source)}
+
+
+def test_iter_news_items_yields_the_first_list_in_document_order():
+    fields = [_extract_news_fields(item) for item in _iter_news_items(_page(NEWS_LIST))]
+
+    assert [clean_text(field["title"]) for field in fields] == [
+        "4番 出走取消", "騎手変更 (負傷)", None, None, "馬場状態 変更 (不利)", "発走時刻変更", "制裁 内容", "お知らせ",
+    ]
+    assert fields[0]["datetime"].split() == ["2025/05/04", "09:12"]
+    assert clean_text(fields[2]["content"]) == "本文のみ"
+
+
+def test_page_fetched_before_the_race_year_ended_expires():
+    fetched_at = datetime(2025, 6, 1).timestamp()
+
+    assert not _is_cache_entry_fresh("202505030811", fetched_at)
+
+
+def test_page_fetched_after_the_race_year_is_kept():
+    fetched_at = datetime(2026, 1, 2).timestamp()
+
+    assert _is_cache_entry_fresh("202505030811", fetched_at)
+
+
+def test_page_of_a_current_race_is_fresh_within_the_ttl():
+    race_id = f"{datetime.now().year}05030811"
+
+    assert _is_cache_entry_fresh(race_id, time.time() - 60)
+    assert not _is_cache_entry_fresh(race_id, time.time() - ANNOUNCEMENT_CACHE_TTL - 60)
+
+
+@pytest.mark.parametrize("body, has_list", [
+    ("<style>.Race_News_List { margin: 0; }</style><script>load('.Race_News_List');</script>"
+     "<!-- Race_News_List --><div id=\"news\"></div>", False),
+    ("<p class=\"Race_News_List\"></p><div class=\"Race_News_ListX\"></div>", False),
+    ("<div class=\"RaceNews Race_News_List\"></div>", True),
+])
+def test_static_news_page_needs_an_actual_news_list(monkeypatch, tmp_path, body, has_list):
+    page_source = _page(body)
+    monkeypatch.setattr(announcement_scraper, "get_html", lambda url: page_source)
+    monkeypatch.setattr(announcement_scraper, "ANNOUNCEMENT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(announcement_scraper, "_memory_cache", OrderedDict())
+
+    race_id = f"{datetime.now().year}99999999"
+    result = announcement_scraper._fetch_news_html_without_browser(race_id)
+
+    assert result == (page_source if has_list else None)
+    assert (announcement_scraper._get_cached_news_html(race_id) is not None) == has_list
+    assert any(tmp_path.iterdir()) == has_list
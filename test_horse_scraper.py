@@ -0,0 +1,112 @@
+"""
+Tests for pedigree table parsing and the static training page check in horse_scraper.
+"""
+import pytest
+
+from scrapers import horse_scraper
+from scrapers.horse_scraper import _parse_pedigree_table
+from utils import parse_html
+
+GENERATIONS = 5
+TABLE_ROWS = 2 ** GENERATIONS
+
+
+def _ancestor_key(generation, row):
+    """Path from the horse to the ancestor whose cell of the given generation starts at row."""
+    block = row // (TABLE_ROWS >> generation)
+    bits = format(block, f"0{generation}b")
+    return "_".join("father" if bit == "0" else "mother" for bit in bits)
+
+
+def _blood_table(gen5_rowspan_attribute=False, unlinked=()):
+    """A 5-generation blood_table laid out like netkeiba's: each cell spans its own ancestors' rows."""
+    rows = []
+    for row in range(TABLE_ROWS):
+        cells = []
+        for generation in range(1, GENERATIONS + 1):
+            rowspan = TABLE_ROWS >> generation
+            if row % rowspan:
+                continue
+            key = _ancestor_key(generation, row)
+            attribute = f' rowspan="{rowspan}"' if rowspan > 1 or gen5_rowspan_attribute else ""
+            name = f"<a href=\"/horse/{key}/\">{key.upper()}</a>" if key not in unlinked else key.upper()
+            cells.append(f"<td{attribute} class=\"b_ml\">\n  {name}\n  <br/><span>1990</span></td>")
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    html = f"<table class=\"blood_table detail\">{''.join(rows)}</table>"
+    return parse_html(html).find("table", class_="blood_table")
+
+
+def _reference_gen1_to_3(ped_table):
+    """Cells read by the original fixed-index parser, where the index pointed at the named ancestor."""
+    rows = ped_table.find_all("tr")
+    positions = {
+        "father": (0, 0), "mother": (16, 0),
+        "father_father": (0, 1), "father_mother": (8, 0), "mother_father": (16, 1), "mother_mother": (24, 0),
+        "father_father_father": (0, 2), "father_mother_father": (8, 1), "father_mother_mother": (12, 0),
+        "mother_father_father": (16, 2), "mother_mother_father": (24, 1), "mother_mother_mother": (28, 0),
+    }
+    reference = {}
+    for key, (row, column) in positions.items():
+        cell = rows[row].find_all("td")[column]
+        reference[key] = {"name": " ".join(cell.text.split()), "url": cell.find("a").get("href")}
+    return reference
+
+
+@pytest.mark.parametrize("gen5_rowspan_attribute", [False, True])
+def test_every_cell_maps_to_its_ancestor(gen5_rowspan_attribute):
+    ancestors = _parse_pedigree_table(_blood_table(gen5_rowspan_attribute))
+
+    expected_keys = {
+        _ancestor_key(generation, row)
+        for generation in range(1, GENERATIONS + 1)
+        for row in range(0, TABLE_ROWS, TABLE_ROWS >> generation)
+    }
+    assert len(ancestors) == 62
+    assert set(ancestors) == expected_keys
+    assert all(value == {"name": f"{key.upper()} 1990", "url": f"/horse/{key}/"} for key, value in ancestors.items())
+
+
+def test_matches_original_parser_for_the_first_three_generations():
+    ped_table = _blood_table()
+    ancestors = _parse_pedigree_table(ped_table)
+
+    for key, value in _reference_gen1_to_3(ped_table).items():
+        assert ancestors[key] == value
+
+
+def test_cells_without_a_link_are_skipped_but_keep_their_place():
+    unlinked = {"mother", "father_mother_father_mother_father"}
+    ancestors = _parse_pedigree_table(_blood_table(unlinked=unlinked))
+
+    assert not unlinked & set(ancestors)
+    assert len(ancestors) == 60
+    assert ancestors["mother_father"]["url"] == "/horse/mother_father/"
+    assert ancestors["father_mother_father_mother_mother"]["url"] == "/horse/father_mother_father_mother_mother/"
+
+
+def test_empty_table():
+    assert _parse_pedigree_table(parse_html("<table class=\"blood_table\"></table>").table) == {}
+
+
+TRAINING_URL = "https://db.netkeiba.com/horse/training/2019104308/"
+
+
+@pytest.mark.parametrize("html, is_static", [
+    ("<html><head><style>table.WorkDataTable td { color: red; }</style>"
+     "<script>render('.oikiri_table'); // <table class=\"WorkDataTable\"></script></head>"
+     "<body><!-- WorkDataTable --><div id=\"app\"></div></body></html>", False),
+    ("<html><body><div class=\"WorkDataTable\"></div><table class=\"WorkDataTableX\"></table></body></html>", False),
+    ("<html><body><table class=\"table_slide_body WorkDataTable\"><tr><td>2025/05/01</td></tr></table></body></html>",
+     True),
+    ("<html><body><table class=\"oikiri_table\"></table></body></html>", True),
+])
+def test_static_training_page_needs_an_actual_workout_table(monkeypatch, html, is_static):
+    monkeypatch.setattr(horse_scraper, "get_html", lambda url: html)
+
+    assert horse_scraper._fetch_static_training_html(TRAINING_URL) == (html if is_static else None)
+
+
+def test_failed_static_training_fetch(monkeypatch):
+    monkeypatch.setattr(horse_scraper, "get_html", lambda url: None)
+
+    assert horse_scraper._fetch_static_training_html(TRAINING_URL) is None
@@ -0,0 +1,48 @@
+"""
+Tests for the market priors and Monte Carlo exotic bet probabilities in probability_models.
+"""
+import pytest
+
+import probability_models
+from probability_models import ProbabilityModels
+
+
+def _make_model(horse_count):
+    horses = [{"umaban": str(i + 1)} for i in range(horse_count)]
+    tan_odds = {str(i + 1): str(1.5 + 2.5 * i) for i in range(horse_count)}
+    model = ProbabilityModels({"horses": horses, "live_odds_data": {"tan_odds": tan_odds}}, {})
+    model.estimate_all_probabilities()
+    return model
+
+
+@pytest.mark.parametrize("horse_count", [3, 8, 18])
+def test_exotic_probabilities_sum_to_one(horse_count):
+    model = _make_model(horse_count)
+
+    for probabilities in (model.estimate_exacta_probabilities(), model.estimate_quinella_probabilities(),
+                          model.estimate_trifecta_probabilities(), model.estimate_trio_probabilities()):
+        assert sum(probabilities.values()) == pytest.approx(1.0)
+
+
+def test_trio_probabilities_match_trifecta_orderings():
+    model = _make_model(12)
+    trifecta = model.estimate_trifecta_probabilities()
+    trio = model.estimate_trio_probabilities()
+
+    summed = {}
+    for combo, probability in trifecta.items():
+        key = "-".join(sorted(combo.split("-")))
+        summed[key] = summed.get(key, 0.0) + probability
+
+    assert set(summed) == set(trio)
+    assert all(trio[combo] == pytest.approx(probability) for combo, probability in summed.items())
+
+
+def test_market_priors_follow_the_odds_even_on_a_hash_collision(monkeypatch):
+    monkeypatch.setattr(probability_models, "hash", lambda value: 0, raising=False)  # Every key collides
+    model = _make_model(3)
+
+    model.race_data = {"live_odds_data": {"tan_odds": {"1": "2.0", "2": "4.0", "3": "4.0"}}}
+    priors = model._calculate_market_priors()
+
+    assert priors == pytest.approx({"1": 0.5, "2": 0.25, "3": 0.25})
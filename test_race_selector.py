@@ -0,0 +1,124 @@
+"""
+Tests for race filtering in race_selector.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from race_selector import RaceDatabase, RaceSelector
+
+
+def _reference_matches(race_data, criteria):
+    """Per-race predicate of the original scalar filter_races_by_criteria."""
+    if "venue" in criteria and race_data.get("venue_name") != criteria["venue"]:
+        return False
+    if "race_class" in criteria:
+        race_class = race_data.get("race_class", "")
+        if not any(cls in race_class for cls in criteria["race_class"]):
+            return False
+    if "min_distance" in criteria and race_data.get("distance_meters", 0) < criteria["min_distance"]:
+        return False
+    if "max_distance" in criteria and race_data.get("distance_meters", 0) > criteria["max_distance"]:
+        return False
+    if "course_type" in criteria and race_data.get("course_type") != criteria["course_type"]:
+        return False
+    if "min_field_size" in criteria and len(race_data.get("horses", [])) < criteria["min_field_size"]:
+        return False
+    if "max_field_size" in criteria and len(race_data.get("horses", [])) > criteria["max_field_size"]:
+        return False
+    return True
+
+
+def _reference_upcoming(races, days_ahead):
+    """Date window of the original get_upcoming_races."""
+    today = datetime.now().date()
+    upcoming = []
+    for race_id, race_data in races.items():
+        for fmt in ["%Y-%m-%d", "%Y/%m/%d", "%Y年%m月%d日"]:
+            try:
+                race_date = datetime.strptime(race_data.get("date") or "", fmt).date()
+            except ValueError:
+                continue
+            if today <= race_date <= today + timedelta(days=days_ahead):
+                upcoming.append(race_id)
+            break
+    return upcoming
+
+
+def _make_races():
+    venues = ["東京", "中山", "京都", None]
+    classes = ["G1", "3勝クラス", "未勝利", "オープン", ""]
+    course_types = ["芝", "ダート", None]
+    today = datetime.now().date()
+    races = {}
+    for i in range(120):
+        race_date = today + timedelta(days=i % 15 - 3)
+        date_format = ["%Y-%m-%d", "%Y/%m/%d", "%Y年%m月%d日"][i % 3]
+        race = {
+            "venue_name": venues[i % len(venues)],
+            "race_class": classes[i % len(classes)],
+            "distance_meters": 1000 + 200 * (i % 9),
+            "course_type": course_types[i % len(course_types)],
+            "horses": [{}] * (i % 19),
+            "date": race_date.strftime(date_format),
+        }
+        if i % 11 == 0:
+            del race["race_class"]
+        if i % 13 == 0:
+            race["date"] = "unknown"
+        races[f"2025{i:08d}"] = race
+    return races
+
+
+CRITERIA = [
+    {},
+    {"venue": "東京"},
+    {"race_class": ["G1", "3勝"]},
+    {"race_class": []},
+    {"min_distance": 1400, "max_distance": 2000},
+    {"course_type": "芝", "min_field_size": 8},
+    {"max_field_size": 12, "venue": "京都", "race_class": ["未勝利", "オープン"]},
+]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_filter_matches_scalar_predicate(criteria):
+    races = _make_races()
+    expected = [race_id for race_id, race_data in races.items() if _reference_matches(race_data, criteria)]
+
+    assert RaceDatabase(races).filter(criteria) == expected
+    assert list(RaceSelector().filter_races_by_criteria(races, criteria)) == expected
+
+
+@pytest.mark.parametrize("days_ahead", [0, 3, 7])
+def test_between_dates_matches_date_window(days_ahead):
+    races = _make_races()
+    selector = RaceSelector(races)
+
+    assert selector.get_upcoming_races(days_ahead) == _reference_upcoming(races, days_ahead)
+
+
+def test_filter_sees_changes_to_the_race_database():
+    races = _make_races()
+    selector = RaceSelector(races)
+    criteria = {"venue": "東京"}
+    selector.filter_races_by_criteria(races, criteria)
+
+    race_id = next(iter(races))
+    races[race_id] = dict(races[race_id], venue_name="中山")  # Edited in place
+    replaced_id = list(races)[1]
+    new_race = races.pop(replaced_id)  # Same length, different id
+    races["202599999999"] = dict(new_race, venue_name="東京")
+
+    expected = [race_id for race_id, race_data in races.items() if _reference_matches(race_data, criteria)]
+    assert list(selector.filter_races_by_criteria(races, criteria)) == expected
+    assert selector.get_upcoming_races(7) == _reference_upcoming(races, 7)
+
+
+def test_zero_width_field_size_range_scores_only_that_size():
+    selector = RaceSelector()
+    selector.set_selection_criteria({"field_size": {"min": 10, "max": 10, "weight": 0.1}})
+
+    scores = selector._field_size_scores
+    assert scores[9] == 30 and scores[10] == 100 and scores[11] == 50
+    assert all(score == score for score in selector.score_races(_make_races()).values())  # No NaN
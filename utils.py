@@ -1,20 +1,46 @@
 """
 Utility functions for the Netkeiba scraper.
 """
+import codecs
+import random
 import re
+import threading
 import time
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 # Import logger and config
 from logger_config import get_logger
-from config import HEADERS, REQUEST_DELAY, SELENIUM_WAIT_TIME
+from config import (
+    HEADERS,
+    MAX_CONCURRENT_REQUESTS,
+    REQUEST_DELAY,
+    REQUEST_DELAY_JITTER,
+    REQUEST_TIMEOUT,
+    SELENIUM_WAIT_TIME,
+)
 from headless_browser import initialize_driver_with_fallback, safe_get_with_retry
 
 # Get logger instance for this module
 logger = get_logger(__name__)
 
+# Keep-alive session shared by all get_soup calls, so TCP/TLS connections are reused.
+# requests sends Accept-Encoding: gzip, deflate by default and decodes the body transparently.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+
+# Bounds the requests in flight across all threads (scrape_horse_lists, scrape_horses_all, ...).
+# The polite delay is taken while holding a slot, so it also caps the request rate.
+_REQUEST_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+# Charset declared in a page's <meta> tag; only the head of the body is searched
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_-]+)""", re.IGNORECASE)
+META_CHARSET_SEARCH_BYTES = 4096
+
 
 def initialize_driver():
     """
@@ -27,33 +53,110 @@ def initialize_driver():
     return initialize_driver_with_fallback()
 
 
-def get_soup(url):
-    """Fetches content from a URL using requests and returns a BeautifulSoup object."""
+def parse_html(markup, parse_only=None):
+    """
+    Parses HTML into a BeautifulSoup object with the C-based lxml tree builder.
+    
+    Falls back to html.parser if lxml fails on the markup (e.g. unusual tag soup in a
+    Selenium page source).
+    
+    Args:
+        markup: HTML string or bytes
+        parse_only: Optional SoupStrainer limiting which elements are built
+    
+    Returns:
+        BeautifulSoup object
+    """
+    try:
+        return BeautifulSoup(markup, "lxml", parse_only=parse_only)
+    except Exception as e:
+        logger.warning(f"lxml could not parse the page, falling back to html.parser: {e}")
+        return BeautifulSoup(markup, "html.parser", parse_only=parse_only)
+
+
+def _response_encoding(response):
+    """
+    Returns the encoding to decode a response with, avoiding charset detection when possible.
+    
+    The charset from the Content-Type header is used when present, then the one declared in
+    a <meta> tag; response.apparent_encoding, which scans the whole body, is the last resort.
+    """
+    if response.encoding and response.encoding.lower() != "iso-8859-1":
+        return response.encoding  # Declared in the headers (requests defaults text/* to ISO-8859-1)
+    
+    declared = META_CHARSET_RE.search(response.content[:META_CHARSET_SEARCH_BYTES])
+    if declared:
+        encoding = declared.group(1).decode("ascii")
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            logger.debug(f"Unknown charset {encoding} declared in page, detecting instead")
+    return response.apparent_encoding
+
+
+def get_html(url):
+    """
+    Fetches a URL using requests and returns the decoded page HTML.
+    
+    Args:
+        url: URL to fetch
+    
+    Returns:
+        Page HTML as a string, or None if the request failed
+    """
     logger.debug(f"Fetching URL with requests: {url}")
     try:
-        time.sleep(REQUEST_DELAY)  # Be polite to the server
-        response = requests.get(url, headers=HEADERS)
+        with _REQUEST_SLOTS:
+            time.sleep(REQUEST_DELAY + random.uniform(0, REQUEST_DELAY_JITTER))  # Be polite to the server
+            response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        response.encoding = response.apparent_encoding  # Adjust encoding
-        soup = BeautifulSoup(response.text, "html.parser")
+        response.encoding = _response_encoding(response)
         # logger.debug(response.text) # Optionally log the full HTML for debugging
-        logger.debug(f"Successfully fetched and parsed URL: {url}")
-        return soup
+        return response.text
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching URL {url}: {e}")
         return None
 
 
+def get_soup(url, parse_only=None):
+    """
+    Fetches content from a URL using requests and returns a BeautifulSoup object.
+    
+    Args:
+        url: URL to fetch
+        parse_only: Optional SoupStrainer; only the matching elements are built. Only pass
+            one when the soup feeds a single scraper that declares a strainer
+            (horse_scraper.HORSE_LIST_STRAINER for scrape_horse_list); race pages are also
+            read by scrape_race_info, which needs the full document.
+    
+    Returns:
+        BeautifulSoup object, or None if the request failed
+    """
+    html = get_html(url)
+    if html is None:
+        return None
+    soup = parse_html(html, parse_only=parse_only)
+    logger.debug(f"Successfully fetched and parsed URL: {url}")
+    return soup
+
+
 def clean_text(text):
-    """Removes extra whitespace and newline characters from text."""
+    """
+    Removes extra whitespace and newline characters from text.
+    
+    Runs of whitespace are collapsed with str.split/join rather than a regex; str.split and
+    the regex \\s agree on every Unicode whitespace character (including \\xa0), so the
+    result is the same.
+    """
     if text:
-        # Ensure text is a string before calling replace
+        # Ensure text is a string before splitting
         if isinstance(text, str):
-            return re.sub(r"\s+", " ", text).strip()
+            return " ".join(text.split())
         else:
             # Handle cases where text might not be a string (e.g., from BeautifulSoup)
             try:
-                return re.sub(r"\s+", " ", str(text)).strip()
+                return " ".join(str(text).split())
             except Exception:
                  logger.warning(f"Could not convert non-string to string for cleaning: {type(text)}")
                  return None # Or return the original non-string object if appropriate